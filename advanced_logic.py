@@ -10,6 +10,7 @@ init(autoreset=True)
 
 MONEY_FILE = "_money.json"
 CARDS_FILE = "_cards.json"
+HISTORY_FILE = "_hands.jsonl"  # Decisions for regret_analyzer.py
 STARTING_MONEY = 1000
 
 GREEN = Fore.GREEN
@@ -117,10 +118,18 @@ class Hand:
 
 
 class BlackjackGame:
-    def __init__(self):
+    def __init__(self, hints=False, record=False):
         self.assets = self._load_assets()
         self.deck = Deck(self.assets)
         self.balance = self._load_money()
+        # Optional hit / stand advice at the prompt, see hint_engine.py
+        self.hints = None
+        if hints:
+            from hint_engine import HintEngine
+
+            self.hints = HintEngine()
+        # Append each hit / stand to HISTORY_FILE for regret_analyzer.py
+        self.record = record
 
     def _load_assets(self):
         try:
@@ -196,7 +205,11 @@ class BlackjackGame:
             if player.get_score() >= 21:
                 playing = False
             else:
+                if self.hints:
+                    print(self.hint_line(player, dealer))
                 choice = input("\n[H]it or [S]tand? ").lower()
+                if self.record:
+                    self.record_decision(player, dealer, "h" if choice == "h" else "s")
                 if choice == "h":
                     player.add(self.deck.deal())
                 else:
@@ -219,6 +232,26 @@ class BlackjackGame:
         self.settle_bet(bet, p_score, d_score)
         self.save_money()
 
+    def hint_line(self, player, dealer):
+        hint = self.hints.hint_for(self, player, dealer)
+        return f"\n{Fore.YELLOW}{hint.line()}{RESET}"
+
+    def record_decision(self, player, dealer, action):
+        """Appends the decision, with the cards the player could not see, to the history."""
+        ranks = {"J": "10", "Q": "10", "K": "10"}
+        # Dealer's first card is face down, so it is still unseen
+        unseen = [0] * 10
+        for card in self.deck.cards + [dealer.cards[0]]:
+            unseen[card.value - 2] += 1
+        record = {
+            "player": [ranks.get(c.rank, c.rank) for c in player.cards],
+            "upcard": ranks.get(dealer.cards[1].rank, dealer.cards[1].rank),
+            "action": action,
+            "shoe": unseen,
+        }
+        with open(HISTORY_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
     def settle_bet(self, bet, p_score, d_score):
         print(f"\n{Fore.YELLOW}--- RESULT ---{RESET}")
         if p_score > 21:
@@ -245,5 +278,14 @@ class BlackjackGame:
 
 
 if __name__ == "__main__":
-    game = BlackjackGame()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Terminal blackjack")
+    parser.add_argument("--hints", action="store_true", help="advice at the prompt")
+    parser.add_argument(
+        "--record", action="store_true", help=f"append decisions to {HISTORY_FILE}"
+    )
+    args = parser.parse_args()
+
+    game = BlackjackGame(hints=args.hints, record=args.record)
     game.start()
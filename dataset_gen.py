@@ -0,0 +1,373 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from demi_god_logic import StrategyEngine
+from fast_kernel import build_action_table, table_index
+from vec_env import (
+    DOUBLE,
+    HIT,
+    OBS_DECKS,
+    OBS_PAIR,
+    OBS_SIZE,
+    OBS_SOFT,
+    OBS_TC,
+    OBS_TOTAL,
+    OBS_TWO,
+    OBS_UP,
+    SPLIT,
+    STAND,
+    VecEnv,
+)
+
+
+# --- Configuration ---
+DATASET_DIR = "_dataset"
+INDEX_FILE = "index.jsonl"
+RECORDS_PER_SHARD = 250000
+TABLES = 64  # VecEnv tables per worker
+WRITE_EVERY = 4096  # Records buffered before a write to the gzip stream
+EPSILON = 0.1  # Chance of a random legal action instead of the policy's
+
+# One decision per record, little-endian, 23 bytes:
+#   total, soft, pair, upcard, true count, decks left, two cards,
+#   action (0 h, 1 s, 2 d, 3 p), explored, behaviour probability of
+#   the action, net of the round it was made in (bets)
+RECORD = struct.Struct("<BBBBffBBBff")
+FIELDS = (
+    "total",
+    "soft",
+    "pair",
+    "upcard",
+    "true_count",
+    "decks_left",
+    "two_cards",
+    "action",
+    "explored",
+    "probability",
+    "round_net",
+)
+SCHEMA = {"format": RECORD.format, "fields": FIELDS, "version": 1}
+
+
+# --- 1. Policies ---
+class SmartBotStrategy:
+    """expert_logic's SmartBot as a strategy: hit / stand on total and upcard."""
+
+    def __init__(self):
+        from expert_logic import SmartBot
+
+        self.bot = SmartBot()
+
+    def get_action(self, hand, dealer_up):
+        self.bot.hand = hand
+        return self.bot.decide_action(dealer_up)
+
+
+def policy_table(name):
+    if name == "basic":
+        return build_action_table(StrategyEngine)
+    if name == "smartbot":
+        return build_action_table(SmartBotStrategy())
+    raise ValueError(f"Unknown policy {name!r}")
+
+
+# --- 2. Shards ---
+def shard_name(shard_id):
+    return f"shard-{shard_id:06d}.bin.gz"
+
+
+def shard_seed(seed, shard_id):
+    """Seeds never overlap between shards: VecEnv uses seed + table."""
+    return (seed << 32) + shard_id * TABLES
+
+
+def generate_shard(out_dir, shard_id, policy, epsilon, seed, records):
+    """
+    Plays `policy` with exploration on a VecEnv and streams whole rounds,
+    at least `records` decisions, into one gzip shard. Written under a
+    temporary name and renamed when complete, so a crash never leaves a
+    half shard behind.
+    Returns the shard's index entry.
+    """
+    table = policy_table(policy)
+    rng = random.Random(shard_seed(seed, shard_id))
+    env = VecEnv(TABLES, seed=shard_seed(seed, shard_id))
+    obs = env.obs_flat
+    actions = env.actions
+    # Decisions of each table's current round, labelled when it ends
+    open_rounds = [[] for _ in range(TABLES)]
+
+    path = os.path.join(out_dir, shard_name(shard_id))
+    tmp = path + ".tmp"
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    written = 0
+    with gzip.open(tmp, "wb") as f:
+        while written < records:
+            for e in range(TABLES):
+                o = e * OBS_SIZE
+                total = int(obs[o + OBS_TOTAL])
+                soft = int(obs[o + OBS_SOFT])
+                pair = int(obs[o + OBS_PAIR])
+                up = int(obs[o + OBS_UP])
+                two = int(obs[o + OBS_TWO])
+                greedy = table[table_index(pair, soft, total, two, up)]
+                legal = (HIT, STAND, DOUBLE, SPLIT) if pair else (HIT, STAND, DOUBLE)
+                action = greedy
+                if rng.random() < epsilon:
+                    action = rng.choice(legal)
+                prob = epsilon / len(legal) + (1 - epsilon if action == greedy else 0)
+                actions[e] = action
+                open_rounds[e].append(
+                    (
+                        total,
+                        soft,
+                        pair,
+                        up,
+                        obs[o + OBS_TC],
+                        obs[o + OBS_DECKS],
+                        two,
+                        action,
+                        int(action != greedy),
+                        prob,
+                    )
+                )
+
+            _, reward, done = env.step(actions)
+            for e in range(TABLES):
+                if done[e]:
+                    net = float(reward[e])
+                    for decision in open_rounds[e]:
+                        buffer += RECORD.pack(*decision, net)
+                    written += len(open_rounds[e])
+                    open_rounds[e] = []
+            # Rounds are kept whole, so the last step may run a few past
+            # `records`; the index entry has the true count
+            if len(buffer) >= WRITE_EVERY * RECORD.size or written >= records:
+                f.write(buffer)
+                digest.update(buffer)
+                buffer = bytearray()
+    os.replace(tmp, path)
+
+    return {
+        "shard": shard_id,
+        "file": shard_name(shard_id),
+        "records": written,
+        "sha256": digest.hexdigest(),
+        "policy": policy,
+        "epsilon": epsilon,
+        "seed": seed,
+        "schema": SCHEMA,
+    }
+
+
+# --- 3. Index ---
+# index.jsonl starts with one {"params": ...} line, the generation
+# parameters every shard in the directory was made with, then one entry
+# per finished shard.
+def generation_params(policy, epsilon, seed, records):
+    params = {
+        "policy": policy,
+        "epsilon": epsilon,
+        "seed": seed,
+        "records": records,
+        "tables": TABLES,
+        "schema": SCHEMA,
+    }
+    return json.loads(json.dumps(params))  # As read back from the index
+
+
+def _read_lines(out_dir):
+    lines = []
+    try:
+        with open(os.path.join(out_dir, INDEX_FILE)) as f:
+            for line in f:
+                try:
+                    lines.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break  # A torn last line
+    except FileNotFoundError:
+        pass
+    return lines
+
+
+def read_params(out_dir):
+    """The index header's generation parameters, None for a new directory."""
+    lines = _read_lines(out_dir)
+    if lines and "params" in lines[0]:
+        return lines[0]["params"]
+    if lines:
+        raise ValueError(f"{out_dir}: index has no parameters header")
+    return None
+
+
+def read_index(out_dir):
+    """Shard entries in the order shards finished."""
+    return [line for line in _read_lines(out_dir) if "params" not in line]
+
+
+def file_digest(path):
+    """sha256 of a shard's records, what the index stores."""
+    digest = hashlib.sha256()
+    with gzip.open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_records(out_dir):
+    """Every record of every indexed shard as a tuple in FIELDS order, streamed."""
+    for entry in read_index(out_dir):
+        with gzip.open(os.path.join(out_dir, entry["file"]), "rb") as f:
+            while True:
+                chunk = f.read(WRITE_EVERY * RECORD.size)
+                if not chunk:
+                    break
+                yield from RECORD.iter_unpack(chunk)
+
+
+# --- 4. Pipeline ---
+def generate(
+    out_dir=DATASET_DIR,
+    shards=8,
+    policy="basic",
+    epsilon=EPSILON,
+    seed=0,
+    records=RECORDS_PER_SHARD,
+    workers=None,
+):
+    """
+    Generates shards 0..shards-1 across a process pool. Shards already in
+    the index are skipped, so an interrupted run resumes where it stopped
+    and a bigger `shards` extends a dataset. Each shard depends only on
+    (seed, shard id), so a resumed dataset is the one a single run makes.
+    A directory holds one set of parameters: resuming with others raises
+    ValueError.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    params = generation_params(policy, epsilon, seed, records)
+    existing = read_params(out_dir)
+    if existing is None:
+        with open(os.path.join(out_dir, INDEX_FILE), "w") as index:
+            index.write(json.dumps({"params": params}) + "\n")
+    elif existing != params:
+        changed = ", ".join(
+            f"{k} {existing.get(k)!r} -> {params[k]!r}"
+            for k in params
+            if existing.get(k) != params[k]
+        )
+        raise ValueError(f"{out_dir} was generated with other parameters: {changed}")
+    done = {entry["shard"] for entry in read_index(out_dir)}
+    todo = [k for k in range(shards) if k not in done]
+    total = 0
+    start = time.time()
+    with open(os.path.join(out_dir, INDEX_FILE), "a") as index:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(generate_shard, out_dir, k, policy, epsilon, seed, records)
+                for k in todo
+            ]
+            for future in as_completed(futures):
+                entry = future.result()
+                index.write(json.dumps(entry) + "\n")
+                index.flush()
+                total += entry["records"]
+                rate = total / (time.time() - start)
+                print(f"Shard {entry['shard']}: {entry['records']:,} records ({rate:,.0f}/s)")
+    print(f"{len(todo)} shards generated, {len(done)} already there")
+
+
+def dedupe(out_dir=DATASET_DIR, check=False):
+    """
+    Rewrites the index with one entry per shard id and per content hash,
+    keeping the first, and deletes shard files no entry points to (left by
+    a crash, or duplicates). check=True also re-hashes every shard and
+    drops entries whose file is missing or does not match.
+    """
+    params = read_params(out_dir)
+    if params is None:
+        print(f"No dataset in {out_dir}")
+        return
+    keep = []
+    ids = set()
+    hashes = set()
+    for entry in read_index(out_dir):
+        path = os.path.join(out_dir, entry["file"])
+        if entry["shard"] in ids or entry["sha256"] in hashes:
+            continue
+        if check and (not os.path.exists(path) or file_digest(path) != entry["sha256"]):
+            print(f"Shard {entry['shard']} is missing or corrupt, dropped")
+            continue
+        keep.append(entry)
+        ids.add(entry["shard"])
+        hashes.add(entry["sha256"])
+
+    tmp = os.path.join(out_dir, INDEX_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(json.dumps({"params": params}) + "\n")
+        for entry in keep:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp, os.path.join(out_dir, INDEX_FILE))
+
+    files = {entry["file"] for entry in keep}
+    removed = 0
+    for name in os.listdir(out_dir):
+        if name.startswith("shard-") and name not in files:
+            os.remove(os.path.join(out_dir, name))
+            removed += 1
+    print(f"{len(keep)} shards kept, {removed} stray files removed")
+
+
+def info(out_dir=DATASET_DIR):
+    params = read_params(out_dir)
+    entries = read_index(out_dir)
+    records = sum(e["records"] for e in entries)
+    size = sum(os.path.getsize(os.path.join(out_dir, e["file"])) for e in entries)
+    print(f"{len(entries)} shards, {records:,} records, {size / 1e6:,.1f} MB")
+    if records:
+        print(f"{8 * size / records:.1f} bits per record ({RECORD.size} bytes raw)")
+    if params:
+        print(
+            f"  policy {params['policy']}, epsilon {params['epsilon']},"
+            f" seed {params['seed']}, {params['records']:,} records per shard"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Labelled decision dataset")
+    parser.add_argument("command", choices=["generate", "dedupe", "info"])
+    parser.add_argument("--out", default=DATASET_DIR)
+    parser.add_argument("--shards", type=int, default=8)
+    parser.add_argument("--records", type=int, default=RECORDS_PER_SHARD)
+    parser.add_argument("--policy", choices=["basic", "smartbot"], default="basic")
+    parser.add_argument("--epsilon", type=float, default=EPSILON)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--check", action="store_true", help="dedupe re-hashes shards")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        try:
+            generate(
+                args.out,
+                args.shards,
+                args.policy,
+                args.epsilon,
+                args.seed,
+                args.records,
+                args.workers,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == "dedupe":
+        dedupe(args.out, args.check)
+    else:
+        info(args.out)
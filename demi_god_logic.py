@@ -1,3 +1,4 @@
+import json
 import random
 
 
@@ -7,6 +8,7 @@ STARTING_MONEY = 10000
 MIN_BET = 50
 BLACKJACK_PAYOUT = 1.5
 SHUFFLE_AT_DECKS_LEFT = 1.5
+MAX_BET_UNITS = 6
 
 
 # --- 1. Core Objects ---
@@ -36,17 +38,21 @@ class Card:
 
 
 class Shoe:
-    def __init__(self):
+    def __init__(self, rng=None, num_decks=NUM_DECKS):
+        self.rng = rng or random
+        self.num_decks = num_decks
+        suits = ["Hearts", "Diamonds", "Clubs", "Spades"]
+        ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+        # Cards are never changed once made, so every shuffle reuses these
+        self.unshuffled = [
+            Card(r, s) for _ in range(num_decks) for s in suits for r in ranks
+        ]
         self.cards = []
         self.build()
 
     def build(self):
-        suits = ["Hearts", "Diamonds", "Clubs", "Spades"]
-        ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
-        self.cards = [
-            Card(r, s) for _ in range(NUM_DECKS) for s in suits for r in ranks
-        ]
-        random.shuffle(self.cards)
+        self.cards = list(self.unshuffled)
+        self.rng.shuffle(self.cards)
 
     def deal(self):
         if not self.cards:
@@ -59,7 +65,10 @@ class Shoe:
 
 # --- 2. Counter ---
 class CardCounter:
-    def __init__(self):
+    def __init__(self, min_bet=MIN_BET, max_units=MAX_BET_UNITS):
+        # The bet ramp: one unit per true count, capped at max_units
+        self.min_bet = min_bet
+        self.max_units = max_units
         self.running_count = 0
         self.true_count = 0
 
@@ -71,9 +80,9 @@ class CardCounter:
 
     def get_bet(self):
         if self.true_count < 1:
-            return MIN_BET
-        units = min(int(self.true_count), 6)
-        return MIN_BET * units
+            return self.min_bet
+        units = min(int(self.true_count), self.max_units)
+        return self.min_bet * units
 
     def reset(self):
         self.running_count = 0
@@ -97,13 +106,18 @@ class StrategyEngine:
         return any(c.rank == "A" for c in hand) and total <= 21
 
     @staticmethod
-    def get_action(hand, dealer_up):
+    def get_action(hand, dealer_up, split=True, double=True):
+        """
+        split=False plays a pair on its total, for a pair that may not be
+        split; double=False hits or stands where the chart would double.
+        """
         d = dealer_up.value
         score = StrategyEngine.hand_value(hand)
         is_soft = StrategyEngine.is_soft(hand)
+        dh = "d" if double else "h"
 
         # Pair logic (2-card only)
-        if len(hand) == 2 and hand[0].value == hand[1].value:
+        if split and len(hand) == 2 and hand[0].value == hand[1].value:
             v = hand[0].value
             if v == 11 or v == 8:
                 return "p"
@@ -126,16 +140,16 @@ class StrategyEngine:
                 return "s"
             if score == 18:
                 if 3 <= d <= 6:
-                    return "d"
+                    return "d" if double else "s"
                 if d in (2, 7, 8):
                     return "s"
                 return "h"
             if score == 17:
-                return "d" if 3 <= d <= 6 else "h"
+                return dh if 3 <= d <= 6 else "h"
             if score in (15, 16):
-                return "d" if 4 <= d <= 6 else "h"
+                return dh if 4 <= d <= 6 else "h"
             if score in (13, 14):
-                return "d" if 5 <= d <= 6 else "h"
+                return dh if 5 <= d <= 6 else "h"
 
         # Hard totals
         if score >= 17:
@@ -145,26 +159,144 @@ class StrategyEngine:
                 return "h"
             return "s" if d <= 6 else "h"
         if score == 11:
-            return "d" if d != 11 else "h"
+            return dh if d != 11 else "h"
         if score == 10:
-            return "d" if d <= 9 else "h"
+            return dh if d <= 9 else "h"
         if score == 9:
-            return "d" if 3 <= d <= 6 else "h"
+            return dh if 3 <= d <= 6 else "h"
         return "h"
 
 
+class ChartStrategy:
+    """
+    Plays a chart produced by strategy_gen.py instead of the hand-written one.
+    Codes: H/S, P split, Dh/Ds double else hit/stand, Rh/Rs surrender else
+    hit/stand. R falls back unless surrender=True, which needs a Simulation
+    whose rules_engine.Rules offer surrender.
+    """
+
+    def __init__(self, chart, surrender=False):
+        self.rules = chart.get("rules", {})
+        self.surrender = surrender
+        self.table = {}
+        for kind in ("hard", "soft", "pairs"):
+            self.table[kind] = {
+                int(t): {int(u): code for u, code in row.items()}
+                for t, row in chart[kind].items()
+            }
+
+    @classmethod
+    def load(cls, path, surrender=False):
+        with open(path, "r") as f:
+            return cls(json.load(f), surrender)
+
+    def get_action(self, hand, dealer_up, split=True, double=True):
+        return self._lookup(self.table, hand, dealer_up, split, double)
+
+    def _lookup(self, table, hand, dealer_up, split=True, double=True):
+        d = dealer_up.value
+        if split and len(hand) == 2 and hand[0].value == hand[1].value:
+            if table["pairs"][hand[0].value][d] == "P":
+                return "p"
+
+        score = StrategyEngine.hand_value(hand)
+        # Soft as strategy_gen solves it: an ace still counted as 11
+        raw = sum(c.value for c in hand)
+        aces = sum(1 for c in hand if c.rank == "A")
+        kind = "soft" if raw - score < 10 * aces and score >= 12 else "hard"
+        code = table[kind][max(score, 4)][d]
+        if code[0] == "D":
+            return "d" if double and len(hand) == 2 else code[1]
+        if code[0] == "R":
+            return "r" if self.surrender and len(hand) == 2 else code[1]
+        return code.lower()
+
+
+class IndexStrategy(ChartStrategy):
+    """
+    A chart plus the count-indexed deviations from deviation_gen.py.
+    One full table per true count is built at load, so a decision costs
+    one list index more than ChartStrategy. The count is truncated like
+    the bet ramp: index +3 plays from TC 3, index -1 from TC -1 down.
+    Reads the counter it is given, so hand the Simulation the same one.
+    """
+
+    count_dependent = True
+
+    def __init__(self, chart, counter, surrender=False):
+        super().__init__(chart, surrender)
+        self.counter = counter
+        self.insurance = chart.get("insurance")
+        self.tc_min = chart["tc_min"]
+        self.tc_max = chart["tc_max"]
+        self.by_count = []
+        for tc in range(self.tc_min, self.tc_max + 1):
+            table = {
+                kind: {total: dict(row) for total, row in rows.items()}
+                for kind, rows in self.table.items()
+            }
+            for kind, rows in chart["deviations"].get(str(tc), {}).items():
+                for total, row in rows.items():
+                    for up, code in row.items():
+                        table[kind][int(total)][int(up)] = code
+            self.by_count.append(table)
+
+    @classmethod
+    def load(cls, path, counter, surrender=False):
+        with open(path, "r") as f:
+            return cls(json.load(f), counter, surrender)
+
+    def take_insurance(self):
+        return self.insurance is not None and self.counter.true_count >= self.insurance
+
+    def get_action(self, hand, dealer_up, split=True, double=True):
+        tc = int(self.counter.true_count) - self.tc_min
+        if tc < 0:
+            tc = 0
+        elif tc >= len(self.by_count):
+            tc = len(self.by_count) - 1
+        return self._lookup(self.by_count[tc], hand, dealer_up, split, double)
+
+
 # --- 4. Simulation ---
 class Simulation:
-    def __init__(self):
-        self.shoe = Shoe()
-        self.counter = CardCounter()
-        self.balance = STARTING_MONEY
+    def __init__(
+        self,
+        seed=None,
+        bankroll=STARTING_MONEY,
+        num_decks=NUM_DECKS,
+        shuffle_at=SHUFFLE_AT_DECKS_LEFT,
+        counter=None,
+        strategy=StrategyEngine,
+        shoe=None,
+        rules=None,
+    ):
+        # A seeded simulation replays the exact same shoes every time,
+        # and so does one given a shoe_trace.TraceShoe.
+        self.rng = random.Random(seed)
+        self.shoe = shoe or Shoe(self.rng, num_decks)
+        self.counter = counter or CardCounter()
+        self.balance = bankroll
+        self.shuffle_at = shuffle_at
+        self.strategy = strategy
+        self.reshuffles = 0
+
+        # rules_engine.Rules other than the classic ones swap in a round
+        # loop specialised for them; play_round below stays the fast path.
+        self.rules = rules
+        if getattr(strategy, "surrender", False) and not (rules and rules.surrender):
+            raise ValueError("The strategy surrenders but the rules do not offer it")
+        if rules is not None and not rules.is_classic():
+            from rules_engine import build_round
+
+            self.play_round = build_round(self, rules)
 
     def play_round(self):
         # Shuffle check
-        if self.shoe.decks_remaining() <= SHUFFLE_AT_DECKS_LEFT:
+        if self.shoe.decks_remaining() <= self.shuffle_at:
             self.shoe.build()
             self.counter.reset()
+            self.reshuffles += 1
 
         self.counter.update_true_count(self.shoe.decks_remaining())
         bet = self.counter.get_bet()
@@ -208,7 +340,7 @@ class Simulation:
                 i += 1
                 continue
 
-            action = StrategyEngine.get_action(hand, dealer[0])
+            action = self.strategy.get_action(hand, dealer[0])
 
             if action == "p" and self.balance >= h["bet"]:
                 c1, c2 = hand
@@ -268,13 +400,56 @@ class Simulation:
             elif p_score < d_score:
                 self.balance -= h["bet"]
 
-    def run(self, rounds=100000):
-        for _ in range(rounds):
+    def run(self, rounds=100000, stats=None, telemetry=None):
+        """
+        Plays up to `rounds` rounds. Pass a sim_stats.StreamingStats
+        to collect per-round distributions as well as the final balance,
+        and a telemetry.Telemetry for live progress.
+        """
+        mask = -1  # `done & -1` is never 0, so no telemetry samples
+        if telemetry is not None:
+            telemetry.start(self, rounds)
+            mask = telemetry.mask
+        done = 0
+        for done in range(1, rounds + 1):
             if self.balance <= 0:
+                done -= 1
                 break
+            if not done & mask:
+                telemetry.sample(self, done - 1)
+            if stats is None:
+                self.play_round()
+                continue
+            before = self.balance
             self.play_round()
+            stats.record(
+                self.balance - before,
+                self.counter.get_bet(),
+                self.counter.true_count,
+                self.balance,
+            )
+        if telemetry is not None:
+            telemetry.finish(self, done)
         print(f"Final balance: ${self.balance}")
+        return stats
 
 
 if __name__ == "__main__":
-    Simulation().run()
+    import argparse
+
+    from fast_kernel import make_simulation
+    from sim_stats import StreamingStats
+    from telemetry import METRICS_PORT, Telemetry
+
+    parser = argparse.ArgumentParser(description="demi_god simulation")
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        nargs="?",
+        const=METRICS_PORT,
+        help=f"serve Prometheus /metrics (default port {METRICS_PORT})",
+    )
+    args = parser.parse_args()
+
+    telemetry = Telemetry(port=args.metrics_port)
+    make_simulation().run(stats=StreamingStats(), telemetry=telemetry).report()
@@ -0,0 +1,164 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from strategy_gen import (
+    DEFAULT_RULES,
+    HandSolver,
+    chart_cells,
+    chart_code,
+    hand_total,
+    print_chart,
+    remove,
+    representative,
+    shoe_at_count,
+)
+
+
+# --- Configuration ---
+DEVIATIONS_FILE = "_deviations.json"
+TC_MIN = -8
+TC_MAX = 8
+# Size of the composition each count is solved on, as a fraction of the shoe.
+# True count is per deck, so depth only changes the weight of the player's
+# own cards; a full shoe makes the TC 0 chart strategy_gen.py's chart.
+REFERENCE_DEPTH = 1.0
+
+
+# --- 1. Solving ---
+def solve_cell_at(cell, rules, comp):
+    """Chart code of one cell on a given composition (upcard still in it)."""
+    kind, total, up = cell
+    cards = representative(kind, total)
+    comp = remove(comp, up, *cards)
+    if min(comp) < 0:
+        return None  # The cell's cards are not in this shoe
+    hand, soft = hand_total(cards)
+    pair = total if kind == "pairs" else None
+    evs = HandSolver(comp, up, rules).action_evs(hand, soft, pair)
+    return chart_code(kind, evs)
+
+
+def solve_count(true_count, rules):
+    """The whole chart at one true count, as {cell: code}."""
+    cards_left = round(52 * rules["decks"] * REFERENCE_DEPTH)
+    comp = shoe_at_count(rules["decks"], cards_left, true_count)
+    return true_count, {cell: solve_cell_at(cell, rules, comp) for cell in chart_cells()}
+
+
+def insurance_index(rules, tc_min=TC_MIN, tc_max=TC_MAX):
+    """Lowest true count where insurance (2:1 on a dealer ten) pays, or None."""
+    cards_left = round(52 * rules["decks"] * REFERENCE_DEPTH)
+    for tc in range(tc_min, tc_max + 1):
+        comp = remove(shoe_at_count(rules["decks"], cards_left, tc), 11)
+        if 3 * comp[8] > sum(comp):
+            return tc
+    return None
+
+
+def generate_deviations(rules=None, tc_min=TC_MIN, tc_max=TC_MAX, workers=None):
+    """
+    Solves the chart at every true count in range across a process pool.
+    The result is a chart (the TC 0 one) that ChartStrategy can play as is,
+    plus "deviations": for each count, only the cells that change.
+    """
+    if not tc_min <= 0 <= tc_max:
+        raise ValueError("the count range must include 0")
+    rules = dict(DEFAULT_RULES, **(rules or {}))
+    counts = list(range(tc_min, tc_max + 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        charts = dict(pool.map(solve_count, counts, [rules] * len(counts)))
+
+    base = charts[0]
+    result = {
+        "rules": rules,
+        "tc_min": tc_min,
+        "tc_max": tc_max,
+        "insurance": insurance_index(rules, tc_min, tc_max),
+        "hard": {},
+        "soft": {},
+        "pairs": {},
+        "deviations": {},
+    }
+    for (kind, total, up), code in base.items():
+        result[kind].setdefault(str(total), {})[str(up)] = code
+    result["hard"]["21"] = {str(up): "S" for up in range(2, 12)}
+    result["soft"]["21"] = {str(up): "S" for up in range(2, 12)}
+
+    for tc, chart in charts.items():
+        changed = {}
+        for (kind, total, up), code in chart.items():
+            if code is not None and code != base[(kind, total, up)]:
+                changed.setdefault(kind, {}).setdefault(str(total), {})[str(up)] = code
+        if changed:
+            result["deviations"][str(tc)] = changed
+    return result
+
+
+# --- 2. Index list ---
+def index_list(result):
+    """
+    One row per cell that deviates: the count nearest 0 where it first
+    changes, and what it changes to. Rows nearest 0 matter most.
+    """
+    rows = {}
+    for tc in sorted((int(t) for t in result["deviations"]), key=abs):
+        for kind, by_total in result["deviations"][str(tc)].items():
+            for total, by_up in by_total.items():
+                for up, code in by_up.items():
+                    key = (kind, int(total), int(up), tc > 0)
+                    if key not in rows:
+                        base = result[kind][total][up]
+                        rows[key] = (tc, base, code)
+    out = [(kind, total, up) + row for (kind, total, up, _), row in rows.items()]
+    return sorted(out, key=lambda r: (abs(r[3]), r[0], r[1], r[2]))
+
+
+def print_indices(result, top=30):
+    ins = result["insurance"]
+    print(f"Insurance: take at TC >= {ins}" if ins is not None else "Insurance: never")
+    print(f"\n{'Hand':<12} {'Up':>3} {'Index':>6}   Basic -> Deviation")
+    for kind, total, up, tc, base, code in index_list(result)[:top]:
+        label = f"{'A' if total == 11 else total} pair" if kind == "pairs" else f"{kind} {total}"
+        sign = ">=" if tc > 0 else "<="
+        up_label = "A" if up == 11 else up
+        print(f"{label:<12} {up_label:>3} {sign}{tc:>+4}   {base:>5} -> {code}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Count-indexed deviation table")
+    parser.add_argument("--decks", type=int, default=DEFAULT_RULES["decks"])
+    parser.add_argument("--h17", action="store_true")
+    parser.add_argument("--no-das", action="store_true")
+    parser.add_argument("--surrender", action="store_true")
+    parser.add_argument("--no-peek", action="store_true")
+    parser.add_argument("--tc-min", type=int, default=TC_MIN)
+    parser.add_argument("--tc-max", type=int, default=TC_MAX)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--out", default=DEVIATIONS_FILE)
+    args = parser.parse_args()
+
+    start = time.time()
+    result = generate_deviations(
+        {
+            "decks": args.decks,
+            "h17": args.h17,
+            "das": not args.no_das,
+            "surrender": args.surrender,
+            "peek": not args.no_peek,
+        },
+        args.tc_min,
+        args.tc_max,
+        args.workers,
+    )
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=1)
+
+    print_chart(result)
+    print()
+    print_indices(result, args.top)
+    solved = args.tc_max - args.tc_min + 1
+    print(f"\nSolved {solved} counts in {time.time() - start:.1f}s, saved to {args.out}")
@@ -0,0 +1,304 @@
+import json
+import random
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from multiprocessing import Process
+
+from demi_god_logic import NUM_DECKS, SHUFFLE_AT_DECKS_LEFT
+from fast_kernel import FastSimulation, make_simulation
+from sim_stats import StreamingStats
+
+
+# --- Configuration ---
+HOST = "127.0.0.1"
+PORT = 5757
+SHARD_SIZE = 10  # Seeds per shard
+ROUNDS_PER_SEED = 10000
+MAX_RETRIES = 3
+SHARD_TIMEOUT = 600  # Seconds a worker may sit on one shard
+WORKER_BANKROLL = 10**12  # Never go broke, we want EV not risk of ruin
+
+
+# --- 1. Shards ---
+def run_shard(seed_start, seed_end, rounds_per_seed, sim_args=None):
+    """
+    Plays every seed in [seed_start, seed_end) and returns its stats.
+    sim_args are passed on to Simulation (num_decks, shuffle_at, ...).
+    Runs on the compiled kernel when fast_kernel.make_simulation can.
+    Each seed is its own run, merged in, so drawdowns never span seeds.
+    """
+    stats = StreamingStats()
+    for seed in range(seed_start, seed_end):
+        sim = make_simulation(seed=seed, bankroll=WORKER_BANKROLL, **(sim_args or {}))
+        run = StreamingStats()
+        if isinstance(sim, FastSimulation):
+            sim.play(rounds_per_seed, run)
+        else:
+            for _ in range(rounds_per_seed):
+                before = sim.balance
+                sim.play_round()
+                # The counter keeps the true count the bet was sized on.
+                run.record(
+                    sim.balance - before,
+                    sim.counter.get_bet(),
+                    sim.counter.true_count,
+                    sim.balance,
+                )
+        stats.merge(run)
+    return stats
+
+
+# --- 2. Wire Protocol ---
+# One JSON object per line, in both directions:
+#   worker -> {"type": "ready"} | {"type": "result", ...} | {"type": "error", ...}
+#   coordinator -> {"type": "shard", ...} | {"type": "done"}
+# A shard carries its seed range, rounds_per_seed and sim_args, the
+# JSON-safe Simulation kwargs (num_decks, shuffle_at) it is played with.
+def send_msg(wfile, msg):
+    wfile.write((json.dumps(msg) + "\n").encode())
+    wfile.flush()
+
+
+def recv_msg(rfile):
+    line = rfile.readline()
+    if not line:
+        raise ConnectionError("Connection closed")
+    return json.loads(line)
+
+
+# --- 3. Coordinator ---
+class Coordinator:
+    """
+    Hands out seed-range shards and merges the stats that come back.
+    A shard whose worker errors, disconnects or times out goes back
+    in the queue, up to MAX_RETRIES times.
+    """
+
+    def __init__(
+        self,
+        seed_start=0,
+        seed_end=100,
+        shard_size=SHARD_SIZE,
+        rounds_per_seed=ROUNDS_PER_SEED,
+        host=HOST,
+        port=PORT,
+        max_retries=MAX_RETRIES,
+        shard_timeout=SHARD_TIMEOUT,
+        sim_args=None,
+    ):
+        self.rounds_per_seed = rounds_per_seed
+        # Simulation kwargs every shard is played with, sent along as JSON
+        self.sim_args = dict(sim_args or {})
+        self.max_retries = max_retries
+        self.shard_timeout = shard_timeout
+
+        self.pending = deque()
+        for shard_id, start in enumerate(range(seed_start, seed_end, shard_size)):
+            self.pending.append((shard_id, start, min(start + shard_size, seed_end)))
+        self.num_shards = len(self.pending)
+        self.attempts = {}
+        self.completed = set()
+        self.failed = []
+        self.stats = StreamingStats()
+        self.cond = threading.Condition()
+
+        self.server = socketserver.ThreadingTCPServer(
+            (host, port), ShardHandler, bind_and_activate=False
+        )
+        self.server.allow_reuse_address = True
+        self.server.daemon_threads = True
+        self.server.coordinator = self
+        self.server.server_bind()
+        self.server.server_activate()
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def finished(self):
+        return len(self.completed) + len(self.failed) >= self.num_shards
+
+    def next_shard(self):
+        """Blocks until a shard is free or everything is accounted for."""
+        with self.cond:
+            while not self.pending and not self.finished():
+                self.cond.wait()
+            if self.pending:
+                return self.pending.popleft()
+            return None
+
+    def complete(self, shard, data):
+        with self.cond:
+            shard_id = shard[0]
+            if shard_id not in self.completed:
+                self.completed.add(shard_id)
+                self.stats.merge(StreamingStats.from_dict(data))
+            self.cond.notify_all()
+
+    def fail(self, shard, reason):
+        with self.cond:
+            shard_id = shard[0]
+            self.attempts[shard_id] = self.attempts.get(shard_id, 0) + 1
+            print(f"Shard {shard_id} failed ({reason}), attempt {self.attempts[shard_id]}")
+            if self.attempts[shard_id] > self.max_retries:
+                self.failed.append(shard)
+            else:
+                self.pending.append(shard)
+            self.cond.notify_all()
+
+    def run(self):
+        """Serves workers until every shard is done. Returns merged stats."""
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        with self.cond:
+            while not self.finished():
+                self.cond.wait()
+        self.server.shutdown()
+        self.server.server_close()
+        if self.failed:
+            print(f"Gave up on {len(self.failed)} shard(s): {self.failed}")
+        return self.stats
+
+
+class ShardHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coord = self.server.coordinator
+        self.request.settimeout(coord.shard_timeout)
+        shard = None
+        try:
+            recv_msg(self.rfile)  # "ready"
+            while True:
+                shard = coord.next_shard()
+                if shard is None:
+                    send_msg(self.wfile, {"type": "done"})
+                    return
+                shard_id, start, end = shard
+                send_msg(
+                    self.wfile,
+                    {
+                        "type": "shard",
+                        "id": shard_id,
+                        "seed_start": start,
+                        "seed_end": end,
+                        "rounds_per_seed": coord.rounds_per_seed,
+                        "sim_args": coord.sim_args,
+                    },
+                )
+                msg = recv_msg(self.rfile)
+                if msg["type"] == "result" and msg["id"] == shard_id:
+                    coord.complete(shard, msg["stats"])
+                else:
+                    coord.fail(shard, msg.get("reason", "bad reply"))
+                shard = None
+        except (OSError, ValueError, KeyError) as e:
+            if shard is not None:
+                coord.fail(shard, repr(e))
+
+
+# --- 4. Worker ---
+def run_worker(host=HOST, port=PORT, drop_rate=0.0, retry_connect=30):
+    """
+    Pulls shards until the coordinator says done.
+    drop_rate makes the worker hang up mid-shard and reconnect,
+    to exercise the coordinator's retries.
+    """
+    while True:
+        for _ in range(retry_connect):
+            try:
+                sock = socket.create_connection((host, port))
+                break
+            except ConnectionRefusedError:
+                time.sleep(0.2)
+        else:
+            return  # Coordinator is gone
+
+        rfile = sock.makefile("rb")
+        wfile = sock.makefile("wb")
+        try:
+            if _work_connection(rfile, wfile, drop_rate):
+                return
+        except ConnectionError:
+            pass
+        finally:
+            rfile.close()
+            wfile.close()
+            sock.close()
+
+
+def _work_connection(rfile, wfile, drop_rate):
+    """Returns True once the coordinator says done, False on a drop."""
+    send_msg(wfile, {"type": "ready"})
+    while True:
+        msg = recv_msg(rfile)
+        if msg["type"] != "shard":
+            return True
+        if drop_rate and random.random() < drop_rate:
+            return False
+        try:
+            stats = run_shard(
+                msg["seed_start"],
+                msg["seed_end"],
+                msg["rounds_per_seed"],
+                msg.get("sim_args"),
+            )
+            reply = {"type": "result", "id": msg["id"], "stats": stats.to_dict()}
+        except Exception as e:
+            reply = {"type": "error", "id": msg["id"], "reason": repr(e)}
+        send_msg(wfile, reply)
+
+
+def run_local(workers=4, drop_rate=0.0, **coordinator_args):
+    """Coordinator plus several worker processes, all on localhost."""
+    coord = Coordinator(port=0, **coordinator_args)
+    host, port = coord.address
+    procs = [
+        Process(target=run_worker, args=(host, port, drop_rate)) for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    stats = coord.run()
+    for p in procs:
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Distributed blackjack simulation")
+    parser.add_argument("mode", choices=["coordinator", "worker", "local"])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--seeds", type=int, default=100)
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--rounds", type=int, default=ROUNDS_PER_SEED)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--decks", type=int, default=NUM_DECKS)
+    parser.add_argument("--shuffle-at", type=float, default=SHUFFLE_AT_DECKS_LEFT)
+    args = parser.parse_args()
+
+    shard_args = {
+        "seed_start": args.seed_start,
+        "seed_end": args.seed_start + args.seeds,
+        "shard_size": args.shard_size,
+        "rounds_per_seed": args.rounds,
+        "sim_args": {"num_decks": args.decks, "shuffle_at": args.shuffle_at},
+    }
+
+    if args.mode == "worker":
+        run_worker(args.host, args.port, args.drop_rate)
+    else:
+        start = time.time()
+        if args.mode == "local":
+            result = run_local(args.workers, args.drop_rate, **shard_args)
+        else:
+            result = Coordinator(host=args.host, port=args.port, **shard_args).run()
+        result.report()
+        print(f"Took {time.time() - start:.1f}s")
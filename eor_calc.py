@@ -0,0 +1,242 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from demi_god_logic import Card
+from strategy_gen import (
+    DEFAULT_RULES,
+    VALUES,
+    HandSolver,
+    full_shoe,
+    hand_total,
+    remove,
+)
+
+
+# --- Configuration ---
+# Swing, in cards of one rank, a count is assumed to see: a decision whose
+# EV gap that much removal could close gets full weight in playing efficiency
+SWING = 26
+# Tag sets per card value 2..9, 10, A. Hi-Lo comes from Card itself.
+TAGS = {
+    "Hi-Lo": [Card("A" if v == 11 else str(v), "Spades").count_value for v in VALUES],
+    "KO": [1, 1, 1, 1, 1, 1, 0, 0, -1, -1],
+    "Hi-Opt I": [0, 1, 1, 1, 1, 0, 0, 0, -1, 0],
+    "Hi-Opt II": [1, 1, 2, 2, 1, 1, 0, 0, -2, 0],
+    "Omega II": [1, 1, 2, 2, 2, 1, 0, -1, -2, 0],
+    "Zen": [1, 1, 2, 2, 2, 1, 0, 0, -2, -1],
+    "Wong Halves": [0.5, 1, 1, 1.5, 1, 0.5, 0, -0.5, -1, -1],
+}
+# Weight of each value in a deck: four ten-valued ranks
+WEIGHTS = [4 if v == 10 else 1 for v in VALUES]
+
+
+# --- 1. Full-shoe EV ---
+def shoe_ev(comp, rules):
+    """
+    Player EV per initial bet off the top of `comp`, every two-card hand
+    played its best way for that composition (total-dependent after the
+    first action). Also returns, per starting hand (a, b, up) with a <= b,
+    its chance and the EV of each action, for the playing efficiency.
+    """
+    n = sum(comp)
+    hands = {}
+    ev = 0.0
+    for a in VALUES:
+        pa = comp[a - 2] / n
+        if not pa:
+            continue
+        after_a = remove(comp, a)
+        for up in VALUES:
+            pu = after_a[up - 2] / (n - 1)
+            if not pu:
+                continue
+            after_up = remove(after_a, up)
+            for b in VALUES:
+                pb = after_up[b - 2] / (n - 2)
+                if not pb:
+                    continue
+                key = (min(a, b), max(a, b), up)
+                if key not in hands:
+                    hands[key] = [0.0, hand_ev(remove(after_up, b), a, b, up, rules)]
+                chance = pa * pu * pb
+                hands[key][0] += chance
+    for chance, (value, _) in hands.values():
+        ev += chance * value
+    return ev, {key: (chance, evs) for key, (chance, (_, evs)) in hands.items()}
+
+
+def hand_ev(comp, a, b, up, rules):
+    """(EV, action EVs) of one starting hand; comp holds the unseen cards."""
+    left = sum(comp)
+    hole_bj = 0.0
+    if up == 11:
+        hole_bj = comp[10 - 2] / left
+    elif up == 10:
+        hole_bj = comp[11 - 2] / left
+    total, soft = hand_total((a, b))
+    if total == 21:
+        return (1 - hole_bj) * rules["payout"], None
+    evs = HandSolver(comp, up, rules).action_evs(total, soft, a if a == b else None)
+    best = max(evs.values())
+    if rules["peek"]:
+        # The solver plays on knowing the dealer has no blackjack
+        return (1 - hole_bj) * best - hole_bj, evs
+    return best, evs
+
+
+def solve_job(job):
+    label, comp, rules = job
+    return label, shoe_ev(comp, rules)
+
+
+# --- 2. Effects of removal ---
+def effects_of_removal(rules=None, workers=None):
+    """
+    Change in player EV per card of each value removed from the full shoe,
+    by central difference: `decks` cards of a value taken out against the
+    same number put in. The full shoe and all 20 shifted shoes are solved
+    across a process pool, each on one worker with its dealer cache.
+    """
+    rules = dict(DEFAULT_RULES, **(rules or {}))
+    decks = rules["decks"]
+    full = full_shoe(decks)
+    k = decks
+    jobs = [("full", full, rules)]
+    for i, v in enumerate(VALUES):
+        for sign in (-1, 1):
+            comp = list(full)
+            comp[i] += sign * k
+            jobs.append(((v, sign), tuple(comp), rules))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        solved = dict(pool.map(solve_job, jobs))
+
+    base_ev, base_hands = solved["full"]
+    eor = []
+    # Hands with a decision, and the actions whose EV gap is followed
+    decided = {key: top_two(evs) for key, (_, evs) in base_hands.items() if evs}
+    hand_eor = {key: [] for key in decided}
+    for v in VALUES:
+        (less, less_hands), (more, more_hands) = solved[(v, -1)], solved[(v, 1)]
+        eor.append((less - more) / (2 * k))
+        for key, (best, second) in decided.items():
+            less_evs, more_evs = less_hands[key][1], more_hands[key][1]
+            less_gap = less_evs[best] - less_evs[second]
+            more_gap = more_evs[best] - more_evs[second]
+            hand_eor[key].append((less_gap - more_gap) / (2 * k))
+    return {
+        "rules": rules,
+        "ev": base_ev,
+        "eor": eor,
+        "hands": {
+            key: (base_hands[key][0], gap(base_hands[key][1]), effects)
+            for key, effects in hand_eor.items()
+        },
+    }
+
+
+def top_two(evs):
+    ranked = sorted(evs, key=evs.get, reverse=True)
+    return ranked[0], ranked[1]
+
+
+def gap(evs):
+    best, second = top_two(evs)
+    return evs[best] - evs[second]
+
+
+# --- 3. Tag quality ---
+def correlation(x, y, weights=WEIGHTS):
+    """Pearson correlation over the 13 ranks (each ten-valued rank counted)."""
+    w = sum(weights)
+    mx = sum(wi * xi for wi, xi in zip(weights, x)) / w
+    my = sum(wi * yi for wi, yi in zip(weights, y)) / w
+    sxy = sum(wi * (xi - mx) * (yi - my) for wi, xi, yi in zip(weights, x, y))
+    sxx = sum(wi * (xi - mx) ** 2 for wi, xi in zip(weights, x))
+    syy = sum(wi * (yi - my) ** 2 for wi, yi in zip(weights, y))
+    if not sxx or not syy:
+        return 0.0
+    return sxy / math.sqrt(sxx * syy)
+
+
+def betting_correlation(tags, result):
+    return correlation(tags, result["eor"])
+
+
+def playing_efficiency(tags, result):
+    """
+    Correlation of the tags with each starting hand's effects of removal
+    on the EV gap between its best and second-best action, averaged over
+    hands. A hand counts by how often it is dealt and how likely the count
+    is to change its play: full weight if removing SWING cards could
+    close its gap, less the further away it is. An approximation of
+    Griffin's playing efficiency, the first decision only, no insurance.
+    """
+    total = weighted = 0.0
+    for chance, gap_ev, effects in result["hands"].values():
+        spread = math.sqrt(
+            sum(w * e * e for w, e in zip(WEIGHTS, effects)) / sum(WEIGHTS)
+        )
+        if not spread:
+            continue
+        weight = chance * min(1.0, SWING * spread / max(gap_ev, 1e-12))
+        weighted += weight * abs(correlation(tags, effects))
+        total += weight
+    return weighted / total if total else 0.0
+
+
+def report(result, tag_sets):
+    rules = result["rules"]
+    print(f"{rules['decks']} decks, player EV off the top {100 * result['ev']:+.3f}%\n")
+    print("Effect of removing one card, % per card x decks (about the one-deck figure)")
+    labels = [("A" if v == 11 else str(v)) for v in VALUES]
+    print("  ".join(f"{label:>6}" for label in labels))
+    print("  ".join(f"{100 * e * rules['decks']:>+6.3f}" for e in result["eor"]))
+    header = " ".join(f"{label:>4}" for label in labels)
+    print(f"\n{'Tags':<14} {header:<49} {'BC':>6} {'PE':>6}")
+    for name, tags in tag_sets.items():
+        shown = " ".join(f"{t:>+4g}" for t in tags)
+        bc = betting_correlation(tags, result)
+        pe = playing_efficiency(tags, result)
+        print(f"{name:<14} {shown:<49} {bc:>6.3f} {pe:>6.3f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Effects of removal and count tag quality")
+    parser.add_argument("--decks", type=int, default=DEFAULT_RULES["decks"])
+    parser.add_argument("--h17", action="store_true")
+    parser.add_argument("--no-das", action="store_true")
+    parser.add_argument("--surrender", action="store_true")
+    parser.add_argument("--no-peek", action="store_true")
+    parser.add_argument(
+        "--tags",
+        action="append",
+        default=[],
+        help='extra tag set, "name=t2,t3,...,t9,tT,tA" (repeatable)',
+    )
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    tag_sets = dict(TAGS)
+    for spec in args.tags:
+        name, _, values = spec.partition("=")
+        values = [float(t) for t in values.split(",")]
+        if len(values) != len(VALUES):
+            parser.error(f"{name}: need {len(VALUES)} tags, 2 to 9, ten, ace")
+        tag_sets[name] = values
+
+    start = time.time()
+    result = effects_of_removal(
+        {
+            "decks": args.decks,
+            "h17": args.h17,
+            "das": not args.no_das,
+            "surrender": args.surrender,
+            "peek": not args.no_peek,
+        },
+        args.workers,
+    )
+    report(result, tag_sets)
+    print(f"\nSolved 21 shoes in {time.time() - start:.1f}s")
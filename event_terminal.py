@@ -0,0 +1,276 @@
+import heapq
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+from colorama import Fore, Style
+
+from advanced_logic import HISTORY_FILE, RED, RESET, BlackjackGame, Hand
+
+try:
+    import selectors
+    import termios
+    import tty
+except ImportError:  # Windows
+    termios = None
+    import msvcrt
+
+
+# --- Config
+DEALER_DELAY = 1.0  # Seconds between dealer cards, any key skips ahead
+POLL = 0.02  # Windows only: how often to check the keyboard
+
+
+# ---- The loop
+class EventLoop:
+    """
+    One thread, one loop: keypresses, timers and redraws.
+    The loop sleeps in select() until a key arrives or the next timer is
+    due, so a key is handled right away whatever animation is running.
+    """
+
+    def __init__(self):
+        self.timers = []  # Heap of (when, seq, callback)
+        self.seq = 0
+        self.key_handler = None
+        self.running = False
+        self.dirty = False
+        self.render = None
+
+    def call_later(self, delay, callback):
+        self.seq += 1
+        entry = [time.monotonic() + delay, self.seq, callback]
+        heapq.heappush(self.timers, entry)
+        return entry
+
+    @staticmethod
+    def cancel(entry):
+        entry[2] = None  # Lazily dropped when it reaches the top
+
+    def request_redraw(self):
+        self.dirty = True
+
+    def stop(self):
+        self.running = False
+
+    def _timeout(self):
+        while self.timers and self.timers[0][2] is None:
+            heapq.heappop(self.timers)
+        if not self.timers:
+            return None
+        return max(0.0, self.timers[0][0] - time.monotonic())
+
+    def _fire_timers(self):
+        now = time.monotonic()
+        while self.timers and self.timers[0][0] <= now:
+            _, _, callback = heapq.heappop(self.timers)
+            if callback is not None:
+                callback()
+
+    def run(self):
+        self.running = True
+        if termios is None:
+            self._run_polling()
+            return
+
+        fd = sys.stdin.fileno()
+        saved = termios.tcgetattr(fd)
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        try:
+            tty.setcbreak(fd)
+            while self.running:
+                if self.dirty:
+                    self.dirty = False
+                    self.render()
+                for _ in sel.select(self._timeout()):
+                    try:
+                        data = os.read(fd, 32)
+                    except OSError:
+                        data = b""
+                    if not data:
+                        # stdin closed: it stays readable, so stop instead of spinning
+                        self.stop()
+                        break
+                    for ch in data.decode(errors="ignore"):
+                        self.key_handler(ch)
+                self._fire_timers()
+        finally:
+            sel.close()
+            try:
+                termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+            except termios.error:
+                pass  # The terminal hung up, nothing left to restore
+
+    def _run_polling(self):
+        while self.running:
+            if self.dirty:
+                self.dirty = False
+                self.render()
+            while msvcrt.kbhit():
+                self.key_handler(msvcrt.getwch())
+            timeout = self._timeout()
+            time.sleep(POLL if timeout is None else min(POLL, timeout))
+            self._fire_timers()
+
+
+# ---- Controller
+class EventBlackjackGame(BlackjackGame):
+    """
+    BlackjackGame as a state machine driven by EventLoop.
+    States: bet -> player -> dealer -> result -> bet ...
+    """
+
+    def __init__(self, hints=False, record=False):
+        super().__init__(hints, record)
+        self.loop = EventLoop()
+        self.loop.render = self.render
+        self.loop.key_handler = self.on_key
+        self.state = "bet"
+        self.typed = ""
+        self.bet = 0
+        self.message = ""
+        self.player = None
+        self.dealer = None
+        self.dealer_timer = None
+        self.hint = None  # Worked out once per decision, not per redraw
+
+    def start(self):
+        self.loop.request_redraw()
+        self.loop.run()
+        print("Game Over.")
+
+    # ---- Input
+    def on_key(self, ch):
+        ch = ch.lower()
+        if ch == "q" and self.state != "dealer":
+            self.loop.stop()
+            return
+
+        if self.state == "bet":
+            if ch.isdigit():
+                self.typed += ch
+            elif ch in ("\x7f", "\b"):
+                self.typed = self.typed[:-1]
+            elif ch in ("\n", "\r") and self.typed:
+                bet = int(self.typed)
+                self.typed = ""
+                self.message = ""
+                if 0 < bet <= self.balance:
+                    self.deal(bet)
+                else:
+                    self.message = f"{RED}Invalid bet.{RESET}"
+        elif self.state == "player" and ch in ("h", "s"):
+            if self.record:
+                self.record_decision(self.player, self.dealer, ch)
+            if ch == "h":
+                self.player.add(self.deck.deal())
+                if self.player.get_score() >= 21:
+                    self.start_dealer()
+                else:
+                    self.update_hint()
+            else:
+                self.start_dealer()
+        elif self.state == "dealer":
+            self.fast_forward()
+        elif self.state == "result" and ch in ("y", "\n", "\r"):
+            if self.balance > 0:
+                self.state = "bet"
+            else:
+                self.loop.stop()
+        elif self.state == "result" and ch == "n":
+            self.loop.stop()
+        self.loop.request_redraw()
+
+    # ---- Round flow
+    def deal(self, bet):
+        if self.deck.remaining() < 10:
+            self.message = f"{Fore.MAGENTA}Shuffling Deck...{Style.RESET_ALL}"
+            self.deck.build()
+
+        self.bet = bet
+        self.player = Hand("Player")
+        self.dealer = Hand("Dealer")
+        self.player.add(self.deck.deal())
+        self.dealer.add(self.deck.deal())
+        self.player.add(self.deck.deal())
+        self.dealer.add(self.deck.deal())
+
+        self.state = "player"
+        if self.player.get_score() >= 21:
+            self.start_dealer()
+        else:
+            self.update_hint()
+
+    def update_hint(self):
+        if self.hints:
+            self.hint = self.hint_line(self.player, self.dealer)
+
+    def start_dealer(self):
+        self.state = "dealer"
+        if self.player.get_score() > 21:
+            self.finish()
+            return
+        self.dealer_timer = self.loop.call_later(DEALER_DELAY, self.dealer_step)
+
+    def dealer_step(self):
+        if self.dealer.get_score() < 17:
+            self.dealer.add(self.deck.deal())
+            self.dealer_timer = self.loop.call_later(DEALER_DELAY, self.dealer_step)
+        else:
+            self.finish()
+        self.loop.request_redraw()
+
+    def fast_forward(self):
+        EventLoop.cancel(self.dealer_timer)
+        while self.dealer.get_score() < 17:
+            self.dealer.add(self.deck.deal())
+        self.finish()
+
+    def finish(self):
+        buf = io.StringIO()
+        with redirect_stdout(buf):
+            self.settle_bet(self.bet, self.player.get_score(), self.dealer.get_score())
+        self.message = buf.getvalue().strip()
+        self.save_money()
+        self.state = "result"
+        self.loop.request_redraw()
+
+    # ---- Drawing
+    def render(self):
+        sys.stdout.write("\033[H\033[2J")
+        print(f"{Fore.YELLOW}=== OOP BLACKJACK ==={Style.RESET_ALL}")
+        if self.state == "bet":
+            if self.message:
+                print(self.message)
+            print(f"\nBalance ${self.balance}. Place bet: {self.typed}", end="", flush=True)
+            return
+
+        if self.state != "result" and self.message:
+            print(self.message)
+        self.dealer.display(hide_first=self.state == "player")
+        self.player.display()
+        if self.state == "player":
+            if self.hint:
+                print(self.hint)
+            print("\n[H]it or [S]tand?", flush=True)
+        elif self.state == "dealer":
+            print(f"\n{Fore.MAGENTA}Dealer reveals... (any key to skip){RESET}", flush=True)
+        else:
+            print(f"\n{self.message}")
+            print("\nPlay again? (y/n, q quits)", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Terminal blackjack on an event loop")
+    parser.add_argument("--hints", action="store_true", help="advice at the prompt")
+    parser.add_argument(
+        "--record", action="store_true", help=f"append decisions to {HISTORY_FILE}"
+    )
+    args = parser.parse_args()
+
+    EventBlackjackGame(hints=args.hints, record=args.record).start()
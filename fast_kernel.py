@@ -0,0 +1,522 @@
+import random
+
+from demi_god_logic import (
+    BLACKJACK_PAYOUT,
+    NUM_DECKS,
+    SHUFFLE_AT_DECKS_LEFT,
+    STARTING_MONEY,
+    Card,
+    CardCounter,
+    Simulation,
+    StrategyEngine,
+)
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+
+# --- Configuration ---
+CHUNK = 4096  # Rounds per kernel call
+MAX_HANDS = 64  # Split hands per round
+MAX_CARDS = 24  # Cards per hand
+ACTIONS = {"h": 0, "s": 1, "d": 2, "p": 3}
+# Ranks in Shoe.build order, so one rng.shuffle permutes both shoes alike
+RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+RANK_VALUES = [Card(r, "Spades").value for r in RANKS]
+
+# Kernel state slots
+TOP, BALANCE, RUNNING, RESHUFFLES, SPARE_USED = range(5)
+
+
+# --- 1. Integer Shoes & Strategy Table ---
+def build_values(rng, num_decks):
+    """Card values of a shuffled shoe, same order Shoe.build would produce."""
+    values = [v for _ in range(num_decks) for _ in range(4) for v in RANK_VALUES]
+    rng.shuffle(values)
+    return values
+
+
+def table_index(pair, soft, score, two, up):
+    return (((pair * 3 + soft) * 22 + score) * 2 + two) * 12 + up
+
+
+def soft_kind(raw, aces, score):
+    """
+    0 hard, 1 soft, 2 soft only once another ace counts 1 (A,A,4).
+    StrategyEngine plays the last as hard and charts as soft, so the
+    table keeps it apart.
+    """
+    if raw - score == 10 * aces:
+        return 0
+    return 1 if raw <= 21 else 2
+
+
+def build_action_table(strategy=StrategyEngine):
+    """
+    Flat action table over (pair value, soft, total, two cards, upcard).
+    Filled by walking every reachable hand and asking the strategy once,
+    which is exact for any strategy that only looks at those features.
+    """
+    table = [ACTIONS["s"]] * table_index(12, 0, 0, 0, 0)
+    ranks = dict(zip(RANK_VALUES, RANKS))
+    seen = set()
+    frontier = [
+        [Card(ranks[a], "Spades"), Card(ranks[b], "Spades")] for a in ranks for b in ranks
+    ]
+    while frontier:
+        hand = frontier.pop()
+        score = StrategyEngine.hand_value(hand)
+        if score >= 21:
+            continue
+        two = int(len(hand) == 2)
+        pair = hand[0].value if two and hand[0].value == hand[1].value else 0
+        soft = soft_kind(
+            sum(c.value for c in hand), sum(c.value == 11 for c in hand), score
+        )
+        key = (pair, soft, score, two)
+        if key in seen:
+            continue
+        seen.add(key)
+        for up in ranks:
+            action = ACTIONS[strategy.get_action(hand, Card(ranks[up], "Hearts"))]
+            table[table_index(pair, soft, score, two, up)] = action
+            if soft == 2 and (pair, 0, score, two) not in seen:
+                # vec_env observes a 0 / 1 soft flag, which calls this hard
+                table[table_index(pair, 0, score, two, up)] = action
+        frontier += [hand + [Card(ranks[v], "Spades")] for v in ranks]
+    return table
+
+
+# --- 2. The Kernel ---
+def play_rounds(
+    shoe,
+    spare,
+    state,
+    table,
+    rules,
+    hand_cards,
+    hand_len,
+    hand_bet,
+    hand_flags,
+    out_net,
+    out_bet,
+    out_tc,
+    max_rounds,
+):
+    """
+    Plays rounds exactly like Simulation.play_round on integer card values.
+    Stops after max_rounds, when the bankroll is gone, or right after a
+    round that used the spare shoe (the caller shuffles a new spare).
+    Returns the number of rounds played.
+    """
+    shuffle_at = rules[0]
+    min_bet = int(rules[1])
+    max_units = int(rules[2])
+    payout = rules[3]
+    full = len(shoe)
+
+    played = 0
+    while played < max_rounds:
+        if state[BALANCE] <= 0:
+            break
+        if state[SPARE_USED]:
+            break
+
+        # Shuffle check
+        if state[TOP] / 52 <= shuffle_at:
+            for k in range(full):
+                shoe[k] = spare[k]
+            state[TOP] = full
+            state[SPARE_USED] = 1
+            state[RUNNING] = 0
+            state[RESHUFFLES] += 1
+
+        decks_left = state[TOP] / 52
+        tc = state[RUNNING] / max(decks_left, 0.5)
+        if tc < 1:
+            bet = min_bet
+        else:
+            bet = min_bet * min(int(tc), max_units)
+        start_balance = state[BALANCE]
+
+        # Deal p1, p2, d1, d2; an empty shoe is rebuilt from the spare
+        dealt = [0, 0, 0, 0]
+        for k in range(4):
+            if state[TOP] == 0:
+                for j in range(full):
+                    shoe[j] = spare[j]
+                state[TOP] = full
+                state[SPARE_USED] = 1
+            state[TOP] -= 1
+            dealt[k] = shoe[state[TOP]]
+        p1, p2, d1, d2 = dealt[0], dealt[1], dealt[2], dealt[3]
+
+        rc = state[RUNNING]
+        for v in (p1, p2, d1):
+            rc += 1 if v <= 6 else (-1 if v >= 10 else 0)
+        hole_count = 1 if d2 <= 6 else (-1 if d2 >= 10 else 0)
+
+        p_val = p1 + p2
+        if p_val > 21:
+            p_val -= 10
+        d_val = d1 + d2
+        if d_val > 21:
+            d_val -= 10
+
+        finished = False
+        if p_val == 21:
+            rc += hole_count
+            if d_val != 21:
+                state[BALANCE] += int(bet * payout)
+            finished = True
+        elif d1 >= 10:
+            rc += hole_count
+            if d_val == 21:
+                state[BALANCE] -= bet
+                finished = True
+
+        if not finished:
+            # hand_flags: bit 0 done, bit 1 split aces
+            hand_cards[0] = p1
+            hand_cards[1] = p2
+            hand_len[0] = 2
+            hand_bet[0] = bet
+            hand_flags[0] = 0
+            n_hands = 1
+
+            i = 0
+            while i < n_hands:
+                if hand_flags[i] & 1:
+                    i += 1
+                    continue
+                base = i * MAX_CARDS
+                n = hand_len[i]
+                raw = 0
+                aces = 0
+                for k in range(n):
+                    v = hand_cards[base + k]
+                    raw += v
+                    if v == 11:
+                        aces += 1
+                score = raw
+                a = aces
+                while score > 21 and a > 0:
+                    score -= 10
+                    a -= 1
+                if score >= 21:
+                    hand_flags[i] |= 1
+                    i += 1
+                    continue
+
+                two = 1 if n == 2 else 0
+                pair = 0
+                if two and hand_cards[base] == hand_cards[base + 1]:
+                    pair = hand_cards[base]
+                soft = 0 if a == 0 else 1 if raw <= 21 else 2
+                action = table[(((pair * 3 + soft) * 22 + score) * 2 + two) * 12 + d1]
+                can_pay = state[BALANCE] >= hand_bet[i]
+
+                if action == 3 and can_pay and n_hands < MAX_HANDS:
+                    c1 = hand_cards[base]
+                    c2 = hand_cards[base + 1]
+                    for k in range(2):
+                        if state[TOP] == 0:
+                            for j in range(full):
+                                shoe[j] = spare[j]
+                            state[TOP] = full
+                            state[SPARE_USED] = 1
+                        state[TOP] -= 1
+                        v = shoe[state[TOP]]
+                        rc += 1 if v <= 6 else (-1 if v >= 10 else 0)
+                        if k == 0:
+                            hand_cards[base + 1] = v
+                        else:
+                            nb = n_hands * MAX_CARDS
+                            hand_cards[nb] = c2
+                            hand_cards[nb + 1] = v
+                    hand_flags[i] = 2 if c1 == 11 else 0
+                    hand_len[n_hands] = 2
+                    hand_bet[n_hands] = hand_bet[i]
+                    hand_flags[n_hands] = 2 if c2 == 11 else 0
+                    n_hands += 1
+                    continue
+
+                if hand_flags[i] & 2:
+                    hand_flags[i] |= 1
+                    i += 1
+                    continue
+
+                if action == 2 and can_pay:
+                    hand_bet[i] *= 2
+                elif action != 0:
+                    # Stand, or a split/double we cannot pay for
+                    hand_flags[i] |= 1
+                    i += 1
+                    continue
+
+                if state[TOP] == 0:
+                    for j in range(full):
+                        shoe[j] = spare[j]
+                    state[TOP] = full
+                    state[SPARE_USED] = 1
+                state[TOP] -= 1
+                v = shoe[state[TOP]]
+                rc += 1 if v <= 6 else (-1 if v >= 10 else 0)
+                hand_cards[base + n] = v
+                hand_len[i] = n + 1
+                if action == 2:
+                    hand_flags[i] |= 1
+                    i += 1
+
+            # Dealer play
+            rc += hole_count
+            raw = d1 + d2
+            aces = (1 if d1 == 11 else 0) + (1 if d2 == 11 else 0)
+            d_score = d_val
+            while d_score < 17:
+                if state[TOP] == 0:
+                    for j in range(full):
+                        shoe[j] = spare[j]
+                    state[TOP] = full
+                    state[SPARE_USED] = 1
+                state[TOP] -= 1
+                v = shoe[state[TOP]]
+                rc += 1 if v <= 6 else (-1 if v >= 10 else 0)
+                raw += v
+                if v == 11:
+                    aces += 1
+                d_score = raw
+                a = aces
+                while d_score > 21 and a > 0:
+                    d_score -= 10
+                    a -= 1
+
+            # Settlement
+            for i in range(n_hands):
+                base = i * MAX_CARDS
+                raw = 0
+                aces = 0
+                for k in range(hand_len[i]):
+                    v = hand_cards[base + k]
+                    raw += v
+                    if v == 11:
+                        aces += 1
+                p_score = raw
+                while p_score > 21 and aces > 0:
+                    p_score -= 10
+                    aces -= 1
+                if p_score > 21:
+                    state[BALANCE] -= hand_bet[i]
+                elif d_score > 21 or p_score > d_score:
+                    state[BALANCE] += hand_bet[i]
+                elif p_score < d_score:
+                    state[BALANCE] -= hand_bet[i]
+
+        state[RUNNING] = rc
+        out_net[played] = state[BALANCE] - start_balance
+        out_bet[played] = bet
+        out_tc[played] = tc
+        played += 1
+    return played
+
+
+if njit is not None:
+    jit_play_rounds = njit(cache=True)(play_rounds)
+else:
+    jit_play_rounds = None
+
+
+# --- 3. The Simulator ---
+class FastSimulation:
+    """
+    Drop-in for Simulation.run on integer-encoded shoes.
+    Uses the numba-compiled kernel when numba is installed, the same
+    kernel as plain Python otherwise. Same seed, same results as Simulation.
+    """
+
+    def __init__(
+        self,
+        seed=None,
+        bankroll=STARTING_MONEY,
+        num_decks=NUM_DECKS,
+        shuffle_at=SHUFFLE_AT_DECKS_LEFT,
+        counter=None,
+        strategy=StrategyEngine,
+        jit=None,
+        trace=None,
+        rules=None,
+    ):
+        if getattr(strategy, "count_dependent", False):
+            raise ValueError("the kernel's action table cannot follow the count")
+        if rules is not None and not rules.is_classic():
+            raise ValueError("the kernel plays the classic rules only")
+        counter = counter or CardCounter()
+        self.rng = random.Random(seed)
+        # A shoe_trace.TraceReader replaces the shuffles. The kernel reads a
+        # shoe ahead, so it runs out one shoe before Simulation would.
+        self.trace = trace
+        self.traced = 0
+        self.num_decks = num_decks if trace is None else trace.num_decks
+        self.jit = jit_play_rounds is not None if jit is None else jit
+        if self.jit and jit_play_rounds is None:
+            raise RuntimeError("numba is not installed")
+        self.kernel = jit_play_rounds if self.jit else play_rounds
+
+        # Two shuffles up front: the shoe Simulation would build, then its next one
+        shoe = self._next_values()
+        self.shoe = self._array(shoe, "int64")
+        self.spare = self._array(self._next_values(), "int64")
+        self.state = self._array([len(shoe), bankroll, 0, 0, 0], "int64")
+        self.table = self._array(build_action_table(strategy), "int64")
+        self.rules = self._array(
+            [shuffle_at, counter.min_bet, counter.max_units, BLACKJACK_PAYOUT],
+            "float64",
+        )
+        self.hand_cards = self._array([0] * (MAX_HANDS * MAX_CARDS), "int64")
+        self.hand_len = self._array([0] * MAX_HANDS, "int64")
+        self.hand_bet = self._array([0] * MAX_HANDS, "int64")
+        self.hand_flags = self._array([0] * MAX_HANDS, "int64")
+        self.out_net = self._array([0] * CHUNK, "int64")
+        self.out_bet = self._array([0] * CHUNK, "int64")
+        self.out_tc = self._array([0.0] * CHUNK, "float64")
+
+    def _next_values(self):
+        if self.trace is None:
+            return build_values(self.rng, self.num_decks)
+        if self.traced >= len(self.trace):
+            raise EOFError(f"trace ran out after {len(self.trace)} shoes")
+        self.traced += 1
+        return self.trace.values(self.traced - 1)
+
+    def _array(self, values, dtype):
+        # numba wants numpy arrays, plain Python is faster on lists
+        return np.array(values, dtype=dtype) if self.jit else list(values)
+
+    @property
+    def balance(self):
+        return int(self.state[BALANCE])
+
+    @property
+    def running_count(self):
+        return int(self.state[RUNNING])
+
+    @property
+    def reshuffles(self):
+        return int(self.state[RESHUFFLES])
+
+    def play(self, rounds, stats=None):
+        """Plays up to `rounds` rounds, returns how many were played."""
+        done = 0
+        while done < rounds:
+            played = self.kernel(
+                self.shoe,
+                self.spare,
+                self.state,
+                self.table,
+                self.rules,
+                self.hand_cards,
+                self.hand_len,
+                self.hand_bet,
+                self.hand_flags,
+                self.out_net,
+                self.out_bet,
+                self.out_tc,
+                min(CHUNK, rounds - done),
+            )
+            if stats is not None:
+                balance = self.balance - sum(self.out_net[k] for k in range(played))
+                for k in range(played):
+                    balance += int(self.out_net[k])
+                    stats.record(
+                        int(self.out_net[k]),
+                        int(self.out_bet[k]),
+                        float(self.out_tc[k]),
+                        balance,
+                    )
+            done += played
+            if self.state[SPARE_USED]:
+                spare = self._next_values()
+                for k, v in enumerate(spare):
+                    self.spare[k] = v
+                self.state[SPARE_USED] = 0
+            elif played == 0:
+                break  # Bankroll gone
+        return done
+
+    def run(self, rounds=100000, stats=None, telemetry=None):
+        """Simulation.run's interface, telemetry sampled between kernel calls."""
+        if telemetry is None:
+            self.play(rounds, stats)
+        else:
+            telemetry.start(self, rounds)
+            done = 0
+            while done < rounds:
+                played = self.play(min(telemetry.mask + 1, rounds - done), stats)
+                done += played
+                if not played:
+                    break
+                if done < rounds:
+                    telemetry.sample(self, done)
+            telemetry.finish(self, done)
+        print(f"Final balance: ${self.balance}")
+        return stats
+
+
+def make_simulation(**kwargs):
+    """The compiled simulator when numba is there, the object one otherwise."""
+    strategy = kwargs.get("strategy")
+    rules = kwargs.get("rules")
+    if (
+        jit_play_rounds is not None
+        and not getattr(strategy, "count_dependent", False)
+        and (rules is None or rules.is_classic())
+    ):
+        return FastSimulation(**kwargs)
+    return Simulation(**kwargs)
+
+
+# --- 4. Verification ---
+def verify(seeds=range(5), rounds=20000, step=997):
+    """
+    Plays Simulation and every available FastSimulation backend side by
+    side and checks balance, running count and reshuffles stay identical.
+    """
+    backends = [False] + ([True] if jit_play_rounds is not None else [])
+    for seed in seeds:
+        ref = Simulation(seed=seed, bankroll=10**9)
+        fast = [FastSimulation(seed=seed, bankroll=10**9, jit=j) for j in backends]
+        done = 0
+        while done < rounds:
+            n = min(step, rounds - done)
+            for _ in range(n):
+                ref.play_round()
+            for sim in fast:
+                sim.play(n)
+                got = (sim.balance, sim.running_count, sim.reshuffles)
+                want = (ref.balance, ref.counter.running_count, ref.reshuffles)
+                if got != want:
+                    raise AssertionError(
+                        f"seed {seed}, round {done + n}, jit={sim.jit}: {got} != {want}"
+                    )
+            done += n
+        print(f"Seed {seed}: {rounds} rounds identical on {len(fast) + 1} backends")
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if "--verify" in sys.argv:
+        verify()
+    else:
+        for name, sim in (
+            ("objects", Simulation(seed=1, bankroll=10**9)),
+            ("kernel", make_simulation(seed=1, bankroll=10**9)),
+        ):
+            start = time.time()
+            sim.run(200000)
+            print(f"{name}: {200000 / (time.time() - start):,.0f} rounds/s")
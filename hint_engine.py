@@ -0,0 +1,331 @@
+import time
+from itertools import islice
+
+
+# --- Configuration ---
+BUDGET_MS = 20  # Time a hint may take; the best answer found by then is shown
+CACHE_SIZE = 500000  # Positions kept across the session
+SLACK_MS = 0.5  # Kept back from the budget for the last node and the answer
+FULL_DECK = (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)  # Per value 2..11, what Deck.build makes
+
+# Rules of advanced_logic.BlackjackGame: the hole card is dealt but not
+# peeked at, the dealer stands on all 17s, a player 21 stops the turn and
+# every win pays even money, two-card 21s included.
+BUST = 5  # Index of a dealer bust in an outcome tuple, after totals 17..21
+
+
+def add_card(total, soft, v):
+    """Total and softness (an ace counted as 11) after drawing a card of value v."""
+    if v == 11:
+        if total + 11 <= 21:
+            return total + 11, True
+        return total + 1, soft
+    total += v
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+
+def hand_state(values):
+    total, soft = 0, False
+    for v in values:
+        total, soft = add_card(total, soft, v)
+    return total, soft
+
+
+def remove(comp, i):
+    return comp[:i] + (comp[i] - 1,) + comp[i + 1 :]
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class Hint:
+    def __init__(self, action, evs, depth, exact, seconds):
+        self.action = action
+        self.evs = evs  # {"h": ev, "s": ev}, per unit bet
+        self.depth = depth  # Hits searched past the first, -1 for the estimate
+        self.exact = exact
+        self.seconds = seconds
+
+    def line(self):
+        word = "HIT" if self.action == "h" else "STAND"
+        if self.exact:
+            quality = "exact"
+        elif self.depth < 0:
+            quality = "estimate"
+        else:
+            quality = f"{self.depth + 1} hits deep"
+        return (
+            f"Hint: {word}  (stand {self.evs['s']:+.3f}, hit {self.evs['h']:+.3f},"
+            f" {quality}, {1000 * self.seconds:.0f}ms)"
+        )
+
+
+# --- 1. Engine ---
+class HintEngine:
+    """
+    Best of hit / stand for the interactive game, from the cards the player
+    has not seen: what is left in the deck plus the dealer's hole card.
+
+    Anytime: the hit EV is found by iterative deepening, first allowing one
+    hit, then two more, and so on; each finished depth is a lower bound at
+    least as good as the last and the search stops when nothing was cut off
+    (the answer is exact) or the budget runs out. Dealer outcomes and
+    searched positions go in a transposition table keyed by the unseen
+    composition, kept for the whole session, so later hints, and the next
+    decision of the same hand, start from what earlier searches found.
+    """
+
+    def __init__(self, budget_ms=BUDGET_MS, cache_size=CACHE_SIZE):
+        self.budget = budget_ms / 1000
+        self.cache_size = cache_size
+        # (comp, dealer total, soft) -> outcome probabilities, always exact
+        self.dealer_cache = {}
+        # (comp, player total, soft, upcard) -> (depth, EV, exact)
+        self.value_cache = {}
+        self.deadline = None
+
+    def hint(self, player_values, up_value, unseen_values, budget_ms=None):
+        """Values as the games use them, Ace = 11. None if there is no decision."""
+        # Everything from here counts against the budget, estimate included
+        start = time.perf_counter()
+        total, soft = hand_state(player_values)
+        if total >= 21:
+            return None
+        comp = [0] * 10
+        for v in unseen_values:
+            comp[v - 2] += 1
+        comp = tuple(comp)
+
+        budget = self.budget if budget_ms is None else budget_ms / 1000
+        self.deadline = start + budget - SLACK_MS / 1000
+        self._trim()
+        # An estimate first, so there is an answer however short the budget
+        evs = self._estimate(comp, total, soft, up_value)
+        depth = -1
+        exact = False
+        try:
+            evs["s"] = self._stand(comp, total, up_value)
+            for d in range(21):
+                evs["h"], exact = self._hit(comp, total, soft, up_value, d)
+                depth = d
+                if exact:
+                    break
+        except _OutOfTime:
+            pass
+        self.deadline = None
+
+        action = "h" if evs["h"] > evs["s"] else "s"
+        return Hint(action, evs, depth, exact, time.perf_counter() - start)
+
+    def hint_for(self, game, player, dealer, budget_ms=None):
+        """Hint for a BlackjackGame's hands: dealer.cards[0] is the hole card."""
+        unseen = [c.value for c in game.deck.cards] + [dealer.cards[0].value]
+        return self.hint(
+            [c.value for c in player.cards], dealer.cards[1].value, unseen, budget_ms
+        )
+
+    def _trim(self):
+        """
+        Drops the oldest entries over a table's size: about what the last
+        search added, so trimming stays a small part of the budget.
+        """
+        for cache in (self.dealer_cache, self.value_cache):
+            extra = len(cache) - self.cache_size
+            if extra > 0:
+                for key in list(islice(cache, extra)):
+                    del cache[key]
+
+    def _tick(self):
+        # A node's own work is tens of microseconds and a clock read a
+        # fraction of one, so reading it at every node costs little
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise _OutOfTime
+
+    def _estimate(self, comp, total, soft, up):
+        """
+        Stand and hit EVs as if every draw came from the current composition,
+        cards not removed as they are dealt: a few dozen states, well under a
+        millisecond, and close to exact until the deck is nearly gone.
+        """
+        if not sum(comp):
+            comp = FULL_DECK
+        n = sum(comp)
+        probs = [(i + 2, c / n) for i, c in enumerate(comp) if c]
+        dealer = {}
+        player = {}
+
+        def dealer_dist(t, s):
+            if t > 21:
+                return (0.0,) * BUST + (1.0,)
+            if t >= 17:
+                out = [0.0] * 6
+                out[t - 17] = 1.0
+                return tuple(out)
+            key = (t, s)
+            if key not in dealer:
+                out = [0.0] * 6
+                for v, p in probs:
+                    sub = dealer_dist(*add_card(t, s, v))
+                    for k in range(6):
+                        out[k] += p * sub[k]
+                dealer[key] = tuple(out)
+            return dealer[key]
+
+        dist = dealer_dist(up, up == 11)
+
+        def stand(t):
+            ev = dist[BUST]
+            for k in range(5):
+                ev += dist[k] if 17 + k < t else -dist[k] if 17 + k > t else 0.0
+            return ev
+
+        def hit(t, s):
+            ev = 0.0
+            for v, p in probs:
+                t2, s2 = add_card(t, s, v)
+                if t2 > 21:
+                    ev -= p
+                elif t2 == 21:
+                    ev += p * stand(21)
+                else:
+                    if (t2, s2) not in player:
+                        player[(t2, s2)] = max(stand(t2), hit(t2, s2))
+                    ev += p * player[(t2, s2)]
+            return ev
+
+        return {"s": stand(total), "h": hit(total, soft)}
+
+    # --- 2. Dealer ---
+    def _dealer(self, comp, total, soft):
+        """Chances of the dealer ending on 17, 18, 19, 20, 21 or busting."""
+        if total > 21:
+            return (0.0,) * BUST + (1.0,)
+        if total >= 17:
+            out = [0.0] * 6
+            out[total - 17] = 1.0
+            return tuple(out)
+        key = (comp, total, soft)
+        cached = self.dealer_cache.get(key)
+        if cached is not None:
+            return cached
+        self._tick()
+        n = sum(comp)
+        if n == 0:
+            comp, n = FULL_DECK, 52  # The game reshuffles an empty deck
+        out = [0.0] * 6
+        for i, count in enumerate(comp):
+            if count:
+                t, s = add_card(total, soft, i + 2)
+                sub = self._dealer(remove(comp, i), t, s)
+                p = count / n
+                for k in range(6):
+                    out[k] += p * sub[k]
+        out = tuple(out)
+        self.dealer_cache[key] = out
+        return out
+
+    def _stand(self, comp, total, up):
+        dist = self._dealer(comp, up, up == 11)
+        ev = dist[BUST]
+        for k in range(5):
+            d = 17 + k
+            if d < total:
+                ev += dist[k]
+            elif d > total:
+                ev -= dist[k]
+        return ev
+
+    # --- 3. Player ---
+    def _value(self, comp, total, soft, up, depth):
+        """(EV of playing on with `depth` more hits allowed, whether it is exact)."""
+        if total == 21:
+            return self._stand(comp, total, up), True
+        key = (comp, total, soft, up)
+        cached = self.value_cache.get(key)
+        if cached is not None and (cached[2] or cached[0] >= depth):
+            return cached[1], cached[2]
+        self._tick()
+        stand = self._stand(comp, total, up)
+        if depth == 0:
+            result = (stand, False)
+        else:
+            hit, exact = self._hit(comp, total, soft, up, depth - 1)
+            result = (max(stand, hit), exact)
+        self.value_cache[key] = (depth,) + result
+        return result
+
+    def _hit(self, comp, total, soft, up, depth):
+        """(EV of hitting now then playing on with `depth` more hits, exact?)"""
+        n = sum(comp)
+        if n == 0:
+            comp, n = FULL_DECK, 52
+        ev = 0.0
+        exact = True
+        for i, count in enumerate(comp):
+            if not count:
+                continue
+            p = count / n
+            t, s = add_card(total, soft, i + 2)
+            if t > 21:
+                ev -= p
+                continue
+            sub, sub_exact = self._value(remove(comp, i), t, s, up, depth)
+            ev += p * sub
+            exact = exact and sub_exact
+        return ev, exact
+
+
+# --- 4. Benchmark ---
+def bench(hands=300, budget_ms=BUDGET_MS, seed=0):
+    """Hints for random decisions dealt through one deck, as the game deals them."""
+    import random
+
+    rng = random.Random(seed)
+    engine = HintEngine(budget_ms)
+    deck = []
+    times = []
+    exact = 0
+    for _ in range(hands):
+        if len(deck) < 10:
+            deck = [v for v in range(2, 12) for _ in range(FULL_DECK[v - 2])]
+            rng.shuffle(deck)
+        player = [deck.pop()]
+        hole = deck.pop()
+        player.append(deck.pop())
+        up = deck.pop()
+        while True:
+            h = engine.hint(player, up, deck + [hole])
+            if h is None:
+                break
+            times.append(h.seconds)
+            exact += h.exact
+            if h.action == "s" or not deck:
+                break
+            player.append(deck.pop())
+    times.sort()
+    p99 = 1000 * times[int(0.99 * (len(times) - 1))]
+    worst = 1000 * times[-1]
+    over = sum(1 for t in times if 1000 * t > budget_ms)
+    print(f"{len(times)} hints, {exact} exact, budget {budget_ms}ms")
+    print(
+        f"median {1000 * times[len(times) // 2]:.1f}ms,"
+        f" p99 {p99:.1f}ms, max {worst:.1f}ms, {over} over budget"
+    )
+    if worst > budget_ms:
+        raise AssertionError(
+            f"hints ran past the {budget_ms}ms budget: p99 {p99:.1f}ms, max {worst:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Hit / stand hints for the game")
+    parser.add_argument("--hands", type=int, default=300)
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="milliseconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    bench(args.hands, args.budget, args.seed)
@@ -0,0 +1,196 @@
+import math
+import time
+
+from demi_god_logic import NUM_DECKS, Simulation
+from distributed_sim import WORKER_BANKROLL
+from sim_stats import TC_CLAMP
+
+
+# --- Configuration ---
+LEVELS = (2, 3, 4, 5)  # True counts where a shoe is split, once each
+SPLITS = 3  # Copies a shoe becomes at each level
+TARGET_FROM = 4  # Buckets the precision target applies to
+TARGET_ERROR = 0.02  # Standard error of the edge, in units of the bet
+BATCH = 200  # Shoes between precision checks
+
+
+class _Bucket:
+    """
+    Weighted sums for one true count bucket. Shoes are the independent
+    samples (their clones are not), so each shoe's sums are folded in
+    whole and the error comes from the spread between the shoes that
+    reached the bucket; below two of them there is no spread to measure.
+    """
+
+    def __init__(self):
+        self.shoes = 0  # That reached this bucket
+        self.rounds = 0  # Actually played
+        self.w = 0.0
+        self.wx = 0.0
+        self.ww = 0.0
+        self.xx = 0.0
+        self.wxw = 0.0
+
+    def fold(self, rounds, w, wx):
+        self.shoes += 1
+        self.rounds += rounds
+        self.w += w
+        self.wx += wx
+        self.ww += w * w
+        self.xx += wx * wx
+        self.wxw += wx * w
+
+    def edge(self):
+        """(mean units won per unit bet, standard error) by the ratio estimator."""
+        shoes = self.shoes
+        if not self.w or shoes < 2:
+            return None, None
+        mean = self.wx / self.w
+        spread = self.xx - 2 * mean * self.wxw + mean * mean * self.ww
+        err = math.sqrt(max(spread, 0.0) * shoes / (shoes - 1)) / self.w
+        return mean, err
+
+
+class SplittingSampler:
+    """
+    demi_god Simulation with shoes split on the way up the count.
+
+    The first time a shoe's true count reaches one of `levels` between
+    rounds, it becomes `splits` copies: the shoe itself, and clones whose
+    unseen cards are reshuffled. Given everything dealt so far every order
+    of the unseen cards is equally likely, so each clone is another draw
+    of how the same shoe goes on, and each copy's rounds are weighted
+    1 / splits per split. Weighted means per count are unbiased, and high
+    counts get `splits` times more rounds per level they sit above, at
+    the cost of playing the clones. splits=1 is the plain simulation.
+    """
+
+    def __init__(
+        self,
+        levels=LEVELS,
+        splits=SPLITS,
+        seed=None,
+        num_decks=NUM_DECKS,
+        shuffle_at=None,
+    ):
+        self.levels = sorted(levels)
+        self.splits = splits
+        kwargs = {} if shuffle_at is None else {"shuffle_at": shuffle_at}
+        self.sim = Simulation(
+            seed=seed, bankroll=WORKER_BANKROLL, num_decks=num_decks, **kwargs
+        )
+        self.buckets = {}
+        self.shoes = 0
+        self.rounds = 0
+
+    def run_shoe(self):
+        """Plays one freshly shuffled shoe and all of its clones."""
+        sim = self.sim
+        shoe = sim.shoe
+        counter = sim.counter
+        levels = self.levels
+        splits = self.splits
+        shoe.build()
+        counter.reset()
+        # This shoe's sums per bucket: [rounds, weight, weighted units won]
+        sums = {}
+        pending = [(shoe.cards, 0, 0, 1.0)]
+        while pending:
+            cards, running, level, weight = pending.pop()
+            shoe.cards = cards
+            counter.running_count = running
+            while shoe.decks_remaining() > sim.shuffle_at:
+                counter.update_true_count(shoe.decks_remaining())
+                tc = counter.true_count
+                if level < len(levels) and tc >= levels[level]:
+                    while level < len(levels) and tc >= levels[level]:
+                        level += 1
+                    weight /= splits
+                    for _ in range(splits - 1):
+                        clone = list(shoe.cards)
+                        sim.rng.shuffle(clone)
+                        pending.append((clone, counter.running_count, level, weight))
+
+                bucket = max(-TC_CLAMP, min(TC_CLAMP, math.floor(tc)))
+                bet = counter.get_bet()
+                before = sim.balance
+                sim.play_round()
+                s = sums.get(bucket)
+                if s is None:
+                    s = sums[bucket] = [0, 0.0, 0.0]
+                s[0] += 1
+                s[1] += weight
+                s[2] += weight * (sim.balance - before) / bet
+
+        for bucket, (rounds, w, wx) in sums.items():
+            b = self.buckets.get(bucket)
+            if b is None:
+                b = self.buckets[bucket] = _Bucket()
+            b.fold(rounds, w, wx)
+            self.rounds += rounds
+        self.shoes += 1
+
+    def run(self, shoes):
+        for _ in range(shoes):
+            self.run_shoe()
+
+    def worst_error(self, start=TARGET_FROM):
+        """
+        Largest standard error over the buckets from `start` up, inf while
+        any of them has been reached by fewer than two shoes.
+        """
+        worst = 0.0
+        for bucket in range(start, TC_CLAMP + 1):
+            b = self.buckets.get(bucket)
+            err = b.edge()[1] if b else None
+            if err is None:
+                return math.inf
+            worst = max(worst, err)
+        return worst
+
+    def run_to(self, target=TARGET_ERROR, start=TARGET_FROM, max_rounds=10**8):
+        """Plays shoes until every bucket from `start` up has error <= target."""
+        while self.worst_error(start) > target and self.rounds < max_rounds:
+            self.run(BATCH)
+
+    def report(self, start=None):
+        print(f"{self.shoes} shoes, {self.rounds:,} rounds played (splits={self.splits})\n")
+        print(f"{'TC':>4} {'Rounds/shoe':>12} {'Played':>10} {'Edge':>20}")
+        for bucket in sorted(self.buckets):
+            if start is not None and bucket < start:
+                continue
+            b = self.buckets[bucket]
+            mean, err = b.edge()
+            if mean is None:
+                continue
+            print(
+                f"{bucket:>+4} {b.w / self.shoes:>12.3f} {b.rounds:>10,}"
+                f" {100 * mean:>9.2f}% +/- {100 * err:.2f}%"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-count edge with high counts split")
+    parser.add_argument("--shoes", type=int, help="fixed number of shoes, else to target")
+    parser.add_argument("--target", type=float, default=TARGET_ERROR)
+    parser.add_argument("--from-tc", type=int, default=TARGET_FROM)
+    parser.add_argument("--levels", default=",".join(map(str, LEVELS)))
+    parser.add_argument("--splits", type=int, default=SPLITS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--decks", type=int, default=NUM_DECKS)
+    parser.add_argument("--compare", action="store_true", help="also run unsplit")
+    args = parser.parse_args()
+
+    levels = [float(t) for t in args.levels.split(",")]
+    runs = [args.splits] + ([1] if args.compare else [])
+    for splits in runs:
+        sampler = SplittingSampler(levels, splits, args.seed, args.decks)
+        start = time.time()
+        if args.shoes:
+            sampler.run(args.shoes)
+        else:
+            sampler.run_to(args.target, args.from_tc)
+        sampler.report()
+        print(f"Took {time.time() - start:.1f}s\n")
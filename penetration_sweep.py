@@ -0,0 +1,95 @@
+import bisect
+import time
+
+from demi_god_logic import NUM_DECKS, Simulation
+from distributed_sim import WORKER_BANKROLL
+from sim_stats import StreamingStats
+
+
+# --- Configuration ---
+# Shuffle points to report, in decks left (SHUFFLE_AT_DECKS_LEFT values)
+CUTS = (3.0, 2.5, 2.0, 1.5, 1.0, 0.75, 0.5)
+
+
+class PenetrationSweep:
+    """
+    One simulation dealt to the deepest cut; every shallower cut read off it.
+
+    With the cut at X the simulator starts a round only while more than X
+    decks are left, and everything before that is the same cards and the
+    same count whatever X is. So each round is tagged with the decks left
+    when it began, and the result for cut X is exactly the rounds tagged
+    above X. Rounds are pooled into one bucket per gap between cuts and
+    the buckets are summed from the shallow end.
+    """
+
+    def __init__(self, cuts=CUTS, seed=None, num_decks=NUM_DECKS):
+        self.cuts = sorted(cuts)
+        self.num_decks = num_decks
+        self.sim = Simulation(
+            seed=seed,
+            bankroll=WORKER_BANKROLL,
+            num_decks=num_decks,
+            shuffle_at=self.cuts[0],
+        )
+        # Bucket b holds rounds begun with cuts[b-1] < decks left <= cuts[b]
+        self.buckets = [StreamingStats() for _ in range(len(self.cuts) + 1)]
+        self.shoes = 0
+
+    def run(self, shoes=10000):
+        sim = self.sim
+        counter = sim.counter
+        cuts = self.cuts
+        buckets = self.buckets
+        played = 0
+        while played < shoes:
+            left = sim.shoe.decks_remaining()
+            if left <= sim.shuffle_at:
+                left = self.num_decks  # play_round shuffles first
+            before = sim.balance
+            sim.play_round()
+            bucket = buckets[bisect.bisect_left(cuts, left)]
+            bucket.record(sim.balance - before, counter.get_bet(), counter.true_count)
+            if sim.shoe.decks_remaining() <= sim.shuffle_at:
+                played += 1
+        self.shoes += shoes
+
+    def results(self):
+        """{cut: StreamingStats of every round that cut would have played}"""
+        out = {}
+        total = StreamingStats()
+        for b in range(len(self.cuts), 0, -1):
+            total.merge(self.buckets[b])
+            out[self.cuts[b - 1]] = StreamingStats().merge(total)
+        return out
+
+    def report(self):
+        print(f"{self.shoes} shoes of {self.num_decks} decks\n")
+        print(f"{'Cut':>5} {'Pen':>6} {'Rounds/shoe':>12} {'EV/round':>16} {'Edge':>8}")
+        for cut, stats in sorted(self.results().items(), reverse=True):
+            net = stats.net
+            pen = 100 * (1 - cut / self.num_decks)
+            edge = 100 * net.total / stats.bet.total if stats.bet.total else 0.0
+            print(
+                f"{cut:>5} {pen:>5.1f}% {net.n / self.shoes:>12.1f}"
+                f" {net.mean:>8.3f} +/- {net.stderr:<5.3f} {edge:>7.3f}%"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Penetration curve from one run")
+    parser.add_argument("--shoes", type=int, default=5000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--decks", type=int, default=NUM_DECKS)
+    parser.add_argument("--cuts", default=",".join(str(c) for c in CUTS))
+    args = parser.parse_args()
+
+    start = time.time()
+    sweep = PenetrationSweep(
+        [float(c) for c in args.cuts.split(",")], args.seed, args.decks
+    )
+    sweep.run(args.shoes)
+    sweep.report()
+    print(f"\nTook {time.time() - start:.1f}s")
@@ -0,0 +1,246 @@
+import json
+import random
+from collections import OrderedDict
+
+from strategy_gen import (
+    DEFAULT_RULES,
+    VALUES,
+    HandSolver,
+    full_shoe,
+    hand_total,
+    shoe_at_count,
+)
+
+
+# --- Configuration ---
+HISTORY_FILE = "_hands.jsonl"
+SOLVER_CACHE = 4096  # (shoe, upcard) solvers kept in memory
+TOLERANCE = 1e-9  # EV gaps smaller than this are not mistakes
+# Rules of the games the histories come from (advanced_logic.BlackjackGame):
+# one deck, no peek, hit / stand only, scores compared so a two-card 21 is
+# paid even money and ties a drawn 21. SmartBot plays the same on 6 decks.
+GAME_RULES = {"decks": 1, "peek": False, "payout": 1.0, "bj_beats_21": False}
+GAME_ACTIONS = "hs"
+
+# Record format, one JSON object per line:
+#   {"player": ["10", "6"], "upcard": "9", "action": "h",
+#    "shoe": [20, 24, ...]}    <- unseen cards per value 2..11, optional
+# Without "shoe" the full shoe minus the visible cards is assumed.
+RANK_VALUE = {"J": 10, "Q": 10, "K": 10, "A": 11}
+
+
+def card_value(rank):
+    return RANK_VALUE.get(rank) or int(rank)
+
+
+def composition(values):
+    counts = [0] * len(VALUES)
+    for v in values:
+        counts[v - 2] += 1
+    return counts
+
+
+def make_record(player_values, up_value, unseen_values, action):
+    """What the recorders write: values are as the games use them, Ace = 11."""
+    ranks = {v: str(v) for v in VALUES}
+    ranks[11] = "A"
+    return {
+        "player": [ranks[v] for v in player_values],
+        "upcard": ranks[up_value],
+        "action": action,
+        "shoe": composition(unseen_values),
+    }
+
+
+# --- 1. Analyzer ---
+class RegretAnalyzer:
+    """
+    Streams decision records and scores each against the best action.
+    A recorded shoe is summarised by half-decks left and Hi-Lo true count
+    and solved on a typical shoe for that state, so the millions of
+    records of a long history share a few thousand cached solvers, each
+    memoising its totals. exact=True solves every recorded shoe as is.
+    """
+
+    def __init__(self, rules=None, exact=False, actions=GAME_ACTIONS):
+        self.rules = {**DEFAULT_RULES, **GAME_RULES, **(rules or {})}
+        self.exact = exact
+        self.actions = actions
+        self.solvers = OrderedDict()
+        self.solves = 0
+        self.decisions = 0
+        self.mistakes = 0
+        self.regret = 0.0
+        # Situation label -> [decisions, mistakes, regret]
+        self.situations = {}
+
+    def _shoe_key(self, comp):
+        if self.exact:
+            return comp
+        left = sum(comp)
+        running = sum(comp[:5]) - comp[8] - comp[9]
+        # Unseen cards: lows still in the shoe mean the seen cards ran high
+        full = full_shoe(self.rules["decks"])
+        running = (sum(full[:5]) - full[8] - full[9]) - running
+        half_decks = max(1, round(left / 26))
+        true_count = round(running / max(left / 52, 0.5))
+        return (half_decks, true_count)
+
+    def _solver(self, comp, up):
+        key = (self._shoe_key(comp), up)
+        solver = self.solvers.get(key)
+        if solver is None:
+            if not self.exact:
+                # Stands for the unseen cards, so the upcard is already out
+                half_decks, true_count = key[0]
+                comp = shoe_at_count(self.rules["decks"], half_decks * 26, true_count)
+            solver = self.solvers[key] = HandSolver(comp, up, self.rules)
+            self.solves += 1
+            if len(self.solvers) > SOLVER_CACHE:
+                self.solvers.popitem(last=False)
+        else:
+            self.solvers.move_to_end(key)
+        return solver
+
+    def evaluate(self, record):
+        """EV of every legal action and the label of the situation."""
+        player = [card_value(r) for r in record["player"]]
+        up = card_value(record["upcard"])
+        if "shoe" in record:
+            comp = tuple(record["shoe"])
+        else:
+            comp = list(full_shoe(self.rules["decks"]))
+            for v in player + [up]:
+                comp[v - 2] -= 1
+            comp = tuple(comp)
+
+        total, soft = hand_total(player)
+        two = len(player) == 2
+        pair = player[0] if two and player[0] == player[1] else None
+        solver = self._solver(comp, up)
+        if two:
+            evs = solver.action_evs(total, soft, pair)
+            evs = {a: ev for a, ev in evs.items() if a in self.actions}
+        else:
+            evs = {"s": solver.stand(total), "h": solver.hit(total, soft)}
+
+        up_label = "A" if up == 11 else str(up)
+        if pair is not None:
+            p = "A" if pair == 11 else pair
+            label = f"{p},{p} v {up_label}"
+        else:
+            label = f"{'soft' if soft else 'hard'} {total} v {up_label}"
+        return evs, label
+
+    def add(self, record):
+        evs, label = self.evaluate(record)
+        action = record["action"]
+        if action not in evs:
+            # Double / split where it is not allowed is played as a hit
+            action = "h" if "h" in evs else "s"
+        best = max(evs.values())
+        loss = best - evs[action]
+
+        self.decisions += 1
+        self.regret += loss
+        row = self.situations.setdefault(label, [0, 0, 0.0])
+        row[0] += 1
+        row[2] += loss
+        if loss > TOLERANCE:
+            self.mistakes += 1
+            row[1] += 1
+
+    def add_file(self, path):
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    self.add(json.loads(line))
+
+    def report(self, top=15):
+        avg = self.regret / self.decisions if self.decisions else 0.0
+        print(f"Decisions: {self.decisions} ({self.solves} solver builds)")
+        print(f"Mistakes: {self.mistakes}")
+        print(f"Regret: {self.regret:.3f} bets, {avg * 100:.3f}% of a bet per decision")
+        print("\nCostliest situations:")
+        print(f"{'Situation':<16} {'Seen':>8} {'Wrong':>8} {'Regret':>10}")
+        rows = sorted(self.situations.items(), key=lambda kv: -kv[1][2])
+        for label, (n, wrong, loss) in rows[:top]:
+            print(f"{label:<16} {n:>8} {wrong:>8} {loss:>10.3f}")
+
+
+# --- 2. Recorders ---
+def record_smartbot(path=HISTORY_FILE, rounds=100000, seed=None):
+    """Plays expert_logic's SmartBot quietly and writes every decision it makes."""
+    from expert_logic import Shoe, SmartBot
+
+    random.seed(seed)
+    shoe = Shoe()
+    bot = SmartBot()
+    with open(path, "w") as f:
+        for _ in range(rounds):
+            bot.hand = [shoe.deal(), shoe.deal()]
+            dealer = [shoe.deal(), shoe.deal()]
+            while bot.get_score() < 21:
+                # The bot cannot see the hole card, so it is still unseen
+                unseen = [c.value for c in shoe.cards] + [dealer[1].value]
+                action = bot.decide_action(dealer[0])
+                f.write(
+                    json.dumps(
+                        make_record(
+                            [c.value for c in bot.hand], dealer[0].value, unseen, action
+                        )
+                    )
+                    + "\n"
+                )
+                if action != "h":
+                    break
+                bot.hand.append(shoe.deal())
+
+            if bot.get_score() <= 21:
+                while _score(dealer) < 17:
+                    dealer.append(shoe.deal())
+            if len(shoe.cards) < 52:
+                shoe.build()
+
+
+def _score(hand):
+    score = sum(c.value for c in hand)
+    aces = sum(1 for c in hand if c.rank == "A")
+    while score > 21 and aces > 0:
+        score -= 10
+        aces -= 1
+    return score
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Decision regret over hand histories")
+    parser.add_argument("command", choices=["record-smartbot", "analyze"])
+    parser.add_argument("--file", default=HISTORY_FILE)
+    parser.add_argument("--rounds", type=int, default=100000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--decks",
+        type=int,
+        default=GAME_RULES["decks"],
+        help="6 for record-smartbot histories",
+    )
+    parser.add_argument("--peek", action="store_true", help="casino rules, not the game's")
+    parser.add_argument("--exact", action="store_true")
+    parser.add_argument(
+        "--actions", default=GAME_ACTIONS, help='"hsdpr" for double / split / surrender'
+    )
+    args = parser.parse_args()
+
+    if args.command == "record-smartbot":
+        record_smartbot(args.file, args.rounds, args.seed)
+    else:
+        start = time.time()
+        analyzer = RegretAnalyzer(
+            {"decks": args.decks, "peek": args.peek}, args.exact, args.actions
+        )
+        analyzer.add_file(args.file)
+        analyzer.report()
+        print(f"Took {time.time() - start:.1f}s")
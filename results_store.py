@@ -0,0 +1,326 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import time
+
+from demi_god_logic import (
+    CardCounter,
+    ChartStrategy,
+    IndexStrategy,
+    MAX_BET_UNITS,
+    MIN_BET,
+    NUM_DECKS,
+    SHUFFLE_AT_DECKS_LEFT,
+)
+from distributed_sim import run_shard
+from sim_stats import StreamingStats
+
+
+# --- Configuration ---
+RESULTS_DB = "_results.db"
+# Every module a stored result depends on, next to this file
+SIMULATOR_FILES = (
+    "demi_god_logic.py",
+    "distributed_sim.py",
+    "fast_kernel.py",
+    "rules_engine.py",
+    "sim_stats.py",
+    "results_store.py",
+)
+
+DEFAULT_CONFIG = {
+    "decks": NUM_DECKS,
+    "penetration": round(1 - SHUFFLE_AT_DECKS_LEFT / NUM_DECKS, 4),
+    "ramp": {"min_bet": MIN_BET, "max_units": MAX_BET_UNITS},
+    "strategy": "basic",
+    "seed": None,
+}
+
+# Only these may appear in a GROUP BY / WHERE, the rest is never put in SQL
+QUERY_FIELDS = ("decks", "penetration", "ramp", "strategy", "seed", "code_version")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_key TEXT UNIQUE NOT NULL,
+    created REAL NOT NULL,
+    code_version TEXT NOT NULL,
+    decks INTEGER NOT NULL,
+    penetration REAL NOT NULL,
+    ramp TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    runtime REAL NOT NULL,
+    net REAL NOT NULL,
+    net_sq REAL NOT NULL,
+    wagered REAL NOT NULL,
+    stats TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_rules ON runs (decks, penetration, strategy);
+CREATE INDEX IF NOT EXISTS runs_by_ramp ON runs (ramp);
+CREATE INDEX IF NOT EXISTS runs_by_version ON runs (code_version);
+
+CREATE TABLE IF NOT EXISTS run_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    true_count INTEGER NOT NULL,
+    rounds INTEGER NOT NULL,
+    net REAL NOT NULL,
+    net_sq REAL NOT NULL,
+    PRIMARY KEY (run_id, true_count)
+);
+CREATE INDEX IF NOT EXISTS counts_by_tc ON run_counts (true_count);
+"""
+
+
+def code_version():
+    """Hash of the simulator's sources, so edits never mix with old results."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    for name in SIMULATOR_FILES:
+        with open(os.path.join(here, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def strategy_digest(config):
+    """Hash of the chart file's contents, None for the built-in strategy."""
+    if config["strategy"] == "basic":
+        return None
+    with open(config["strategy"], "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def normalize_config(config=None):
+    """Fills in defaults and pins a seed, so every stored run is reproducible."""
+    full = dict(DEFAULT_CONFIG)
+    full.update(config or {})
+    full["ramp"] = dict(DEFAULT_CONFIG["ramp"], **full["ramp"])
+    full["penetration"] = round(full["penetration"], 4)
+    if full["seed"] is None:
+        full["seed"] = random.randrange(2**31)
+    return full
+
+
+def simulation_args(config):
+    """
+    Simulation kwargs for a config. A strategy other than "basic" is a chart
+    file, played with its count indices if deviation_gen.py wrote it.
+    """
+    ramp = config["ramp"]
+    counter = CardCounter(ramp["min_bet"], ramp["max_units"])
+    args = {
+        "num_decks": config["decks"],
+        "shuffle_at": config["decks"] * (1 - config["penetration"]),
+        "counter": counter,
+    }
+    if config["strategy"] != "basic":
+        with open(config["strategy"], "r") as f:
+            chart = json.load(f)
+        if "deviations" in chart:
+            args["strategy"] = IndexStrategy(chart, counter)
+        else:
+            args["strategy"] = ChartStrategy(chart)
+    return args
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+# --- 1. The Store ---
+class ResultsStore:
+    """
+    SQLite file holding one row per completed run.
+    A run is identified by config + rounds + code version + the chart's
+    contents, so storing the same run twice is a no-op and a chart
+    regenerated in place is a new run.
+    """
+
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    @staticmethod
+    def run_key(config, rounds, version):
+        raw = _canonical(
+            {
+                "config": config,
+                "rounds": rounds,
+                "version": version,
+                "chart": strategy_digest(config),
+            }
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def find(self, config, rounds, version=None):
+        key = self.run_key(config, rounds, version or code_version())
+        return self.db.execute("SELECT * FROM runs WHERE run_key = ?", (key,)).fetchone()
+
+    def record(self, config, rounds, runtime, stats, version=None):
+        """Stores a finished run. Returns False if it was already there."""
+        version = version or code_version()
+        key = self.run_key(config, rounds, version)
+        with self.db:
+            cur = self.db.execute(
+                """
+                INSERT OR IGNORE INTO runs (
+                    run_key, created, code_version, decks, penetration, ramp,
+                    strategy, seed, rounds, runtime, net, net_sq, wagered, stats
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    time.time(),
+                    version,
+                    config["decks"],
+                    config["penetration"],
+                    _canonical(config["ramp"]),
+                    config["strategy"],
+                    config["seed"],
+                    stats.net.n,
+                    runtime,
+                    stats.net.total,
+                    stats.net.sum_sq,
+                    stats.bet.total,
+                    json.dumps(stats.to_dict()),
+                ),
+            )
+            if cur.rowcount == 0:
+                return False
+            self.db.executemany(
+                "INSERT INTO run_counts VALUES (?, ?, ?, ?, ?)",
+                [
+                    (cur.lastrowid, tc, s.n, s.total, s.sum_sq)
+                    for tc, s in stats.per_count.items()
+                ],
+            )
+        return True
+
+    def load_stats(self, row):
+        return StreamingStats.from_dict(json.loads(row["stats"]))
+
+    # --- Queries ---
+    @staticmethod
+    def _where(filters):
+        clauses, params = [], []
+        for field, value in (filters or {}).items():
+            if field not in QUERY_FIELDS:
+                raise ValueError(f"Unknown field: {field}")
+            if field == "ramp":
+                value = _canonical(value)
+            clauses.append(f"{field} = ?")
+            params.append(value)
+        sql = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return sql, params
+
+    def aggregate(self, group_by, **filters):
+        """
+        Pooled results per value of one config field, e.g.
+        aggregate("penetration", decks=6) -> EV by penetration for 6 decks.
+        """
+        if group_by not in QUERY_FIELDS:
+            raise ValueError(f"Unknown field: {group_by}")
+        where, params = self._where(filters)
+        return self.db.execute(
+            f"""
+            SELECT {group_by} AS value,
+                   COUNT(*) AS runs,
+                   SUM(rounds) AS rounds,
+                   SUM(net) / SUM(rounds) AS ev,
+                   SUM(net_sq) / SUM(rounds) AS ev_sq,
+                   SUM(net) / SUM(wagered) AS edge,
+                   SUM(runtime) AS runtime
+            FROM runs{where}
+            GROUP BY {group_by}
+            ORDER BY {group_by}
+            """,
+            params,
+        ).fetchall()
+
+    def ev_by_count(self, **filters):
+        """Pooled EV per true count bucket over all matching runs."""
+        where, params = self._where(filters)
+        return self.db.execute(
+            f"""
+            SELECT c.true_count AS value,
+                   SUM(c.rounds) AS rounds,
+                   SUM(c.net) / SUM(c.rounds) AS ev,
+                   SUM(c.net_sq) / SUM(c.rounds) AS ev_sq
+            FROM run_counts c
+            JOIN runs ON runs.id = c.run_id{where}
+            GROUP BY c.true_count
+            ORDER BY c.true_count
+            """,
+            params,
+        ).fetchall()
+
+
+# --- 2. Running & Recording ---
+def run_and_record(store, config=None, rounds=100000):
+    """
+    Runs one seeded simulation and stores it.
+    If the identical run is already stored it is returned, not replayed.
+    """
+    config = normalize_config(config)
+    existing = store.find(config, rounds)
+    if existing is not None:
+        return existing, False
+
+    start = time.time()
+    stats = run_shard(config["seed"], config["seed"] + 1, rounds, simulation_args(config))
+    store.record(config, rounds, time.time() - start, stats)
+    return store.find(config, rounds), True
+
+
+def print_rows(rows, label):
+    print(f"{label:<14} {'Rounds':>12} {'EV/round':>10} {'Edge':>8}")
+    for row in rows:
+        edge = f"{row['edge'] * 100:7.3f}%" if "edge" in row.keys() else "-"
+        print(f"{str(row['value']):<14} {row['rounds']:>12} {row['ev']:>10.3f} {edge:>8}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulation results store")
+    parser.add_argument("command", choices=["run", "query", "counts"])
+    parser.add_argument("--db", default=RESULTS_DB)
+    parser.add_argument("--decks", type=int)
+    parser.add_argument("--penetration", type=float)
+    parser.add_argument("--strategy")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--rounds", type=int, default=100000)
+    parser.add_argument("--group-by", default="penetration")
+    args = parser.parse_args()
+
+    fields = {
+        k: v
+        for k, v in (
+            ("decks", args.decks),
+            ("penetration", args.penetration),
+            ("strategy", args.strategy),
+            ("seed", args.seed),
+        )
+        if v is not None
+    }
+
+    results = ResultsStore(args.db)
+    if args.command == "run":
+        row, fresh = run_and_record(results, fields, args.rounds)
+        state = "Recorded" if fresh else "Already stored"
+        print(f"{state}: run {row['id']} ({row['rounds']} rounds, {row['runtime']:.1f}s)")
+        results.load_stats(row).report()
+    elif args.command == "query":
+        print_rows(results.aggregate(args.group_by, **fields), args.group_by)
+    else:
+        print_rows(results.ev_by_count(**fields), "true_count")
+    results.close()
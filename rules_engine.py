@@ -0,0 +1,409 @@
+from demi_god_logic import BLACKJACK_PAYOUT, StrategyEngine
+
+
+# --- Configuration ---
+# The solver needs a number; a 9th hand is rare enough to call this unlimited
+SOLVER_MAX_SPLITS = 8
+
+
+# --- 1. Rules ---
+class Rules:
+    """
+    Table rules for demi_god_logic.Simulation.
+    The defaults are what the simulator has always played, quirks included:
+    S17, double on any hand (even after hitting) and after splits,
+    unlimited resplits including aces, 3:2, peek, no surrender or insurance.
+
+    double_on: "any" hand, "two" cards only, or a tuple of two-card totals
+    such as (9, 10, 11). max_splits: None for unlimited.
+    """
+
+    def __init__(
+        self,
+        h17=False,
+        das=True,
+        max_splits=None,
+        resplit_aces=True,
+        double_on="any",
+        surrender=False,
+        insurance=False,
+        payout=BLACKJACK_PAYOUT,
+        peek=True,
+    ):
+        self.h17 = h17
+        self.das = das
+        self.max_splits = max_splits
+        self.resplit_aces = resplit_aces
+        self.double_on = double_on if isinstance(double_on, str) else tuple(double_on)
+        self.surrender = surrender
+        self.insurance = insurance
+        self.payout = payout
+        self.peek = peek
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, rules):
+        """From Rules.to_dict() or strategy_gen's rules dict (a chart's "rules")."""
+        rules = dict(rules)
+        if "double_on" in rules and rules["double_on"] is None:
+            rules["double_on"] = "two"  # strategy_gen doubles on any first two cards
+        known = vars(cls())
+        return cls(**{k: v for k, v in rules.items() if k in known})
+
+    def solver_rules(self, decks):
+        """strategy_gen's rules dict for these rules, to solve a matching chart."""
+        max_splits = self.max_splits
+        double_on = self.double_on
+        return {
+            "decks": decks,
+            "h17": self.h17,
+            "das": self.das,
+            "max_splits": SOLVER_MAX_SPLITS if max_splits is None else max_splits,
+            "surrender": self.surrender,
+            "peek": self.peek,
+            "payout": self.payout,
+            "double_on": None if isinstance(double_on, str) else list(double_on),
+        }
+
+    def is_classic(self):
+        return self.to_dict() == Rules().to_dict()
+
+    def __repr__(self):
+        changed = {k: v for k, v in self.to_dict().items() if Rules().to_dict()[k] != v}
+        return f"Rules({', '.join(f'{k}={v!r}' for k, v in changed.items())})"
+
+
+def double_table(rules):
+    """Every (split hand, two cards, total) a double is allowed on."""
+    allowed = set()
+    for split in (False, True):
+        if split and not rules.das:
+            continue
+        for two in (True, False):
+            if not two and rules.double_on != "any":
+                continue
+            for total in range(4, 22):
+                if isinstance(rules.double_on, str) or total in rules.double_on:
+                    allowed.add((split, two, total))
+    return frozenset(allowed)
+
+
+# --- 2. Dealer ---
+def stands_s17(hand):
+    return StrategyEngine.hand_value(hand) >= 17
+
+
+def stands_h17(hand):
+    total = sum(c.value for c in hand)
+    aces = sum(1 for c in hand if c.rank == "A")
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    # An ace still counted as 11 makes it soft
+    return total > 17 or (total == 17 and not aces)
+
+
+# --- 3. The Round Loop ---
+def build_round(sim, rules):
+    """
+    play_round for `sim` under `rules`, specialised once here: each rule
+    is bound into a local or has picked which small function runs, and
+    doubles are checked against a precomputed table, so the loop itself
+    tests no rule flags. Same round flow as Simulation.play_round.
+    A pair that may not be split, or a double that may not be taken, is
+    asked of the strategy again with split=False / double=False, which
+    StrategyEngine and the chart strategies take.
+    """
+    shoe = sim.shoe
+    counter = sim.counter
+    strategy = sim.strategy
+    deal = shoe.deal
+    observe = counter.observe
+    value = StrategyEngine.hand_value
+    payout = rules.payout
+    split_limit = float("inf") if rules.max_splits is None else rules.max_splits
+    resplit_aces = rules.resplit_aces
+    can_double = double_table(rules)
+    dealer_stands = stands_h17 if rules.h17 else stands_s17
+    take_insurance = getattr(strategy, "take_insurance", None)
+
+    def offered(dealer):
+        return dealer[0].value == 11 and take_insurance()
+
+    def not_offered(dealer):
+        return False
+
+    insured = offered if rules.insurance and take_insurance else not_offered
+
+    # --- Opening: blackjacks, insurance, the peek ---
+    def open_peek(bet, player, dealer):
+        took = insured(dealer)
+        d_bj = value(dealer) == 21
+        if value(player) == 21:
+            observe(dealer[1])
+            if took:
+                sim.balance += bet  # Even money
+            elif not d_bj:
+                sim.balance += int(bet * payout)
+            return True
+        if dealer[0].value in (10, 11):
+            # Counted again when the dealer plays, as the classic loop does
+            observe(dealer[1])
+            if took:
+                sim.balance += bet if d_bj else -(bet // 2)
+            if d_bj:
+                sim.balance -= bet
+                return True
+        return False
+
+    def open_no_peek(bet, player, dealer):
+        took = insured(dealer)
+        d_bj = value(dealer) == 21
+        if value(player) == 21:
+            observe(dealer[1])
+            if took:
+                sim.balance += bet
+            elif not d_bj:
+                sim.balance += int(bet * payout)
+            return True
+        if took:
+            sim.balance += bet if d_bj else -(bet // 2)
+        return False
+
+    # --- Settlement ---
+    def settle(hands, dealer):
+        d_score = value(dealer)
+        for h in hands:
+            if h["surrendered"]:
+                sim.balance -= h["bet"] // 2
+                continue
+            p_score = value(h["cards"])
+            if p_score > 21:
+                sim.balance -= h["bet"]
+            elif d_score > 21 or p_score > d_score:
+                sim.balance += h["bet"]
+            elif p_score < d_score:
+                sim.balance -= h["bet"]
+
+    def settle_no_peek(hands, dealer):
+        # Without a peek a dealer blackjack takes doubles and splits too
+        if len(dealer) == 2 and value(dealer) == 21:
+            for h in hands:
+                sim.balance -= h["bet"] // 2 if h["surrendered"] else h["bet"]
+            return
+        settle(hands, dealer)
+
+    opening = open_peek if rules.peek else open_no_peek
+    settlement = settle if rules.peek else settle_no_peek
+
+    def play_round():
+        if shoe.decks_remaining() <= sim.shuffle_at:
+            shoe.build()
+            counter.reset()
+            sim.reshuffles += 1
+
+        counter.update_true_count(shoe.decks_remaining())
+        bet = counter.get_bet()
+
+        player = [deal(), deal()]
+        dealer = [deal(), deal()]
+        for c in player + [dealer[0]]:
+            observe(c)
+
+        if opening(bet, player, dealer):
+            return
+
+        up = dealer[0]
+        hands = [
+            {
+                "cards": player,
+                "bet": bet,
+                "done": False,
+                "split": False,
+                "split_aces": False,
+                "surrendered": False,
+            }
+        ]
+        splits = 0
+        i = 0
+        while i < len(hands):
+            h = hands[i]
+            hand = h["cards"]
+            score = value(hand)
+            if h["done"] or score >= 21:
+                i += 1
+                continue
+
+            action = strategy.get_action(hand, up)
+
+            if action == "p":
+                if (
+                    splits < split_limit
+                    and sim.balance >= h["bet"]
+                    and (resplit_aces or not h["split_aces"])
+                ):
+                    c1, c2 = hand
+                    h["cards"] = [c1, deal()]
+                    h["split"] = True
+                    h["split_aces"] = c1.rank == "A"
+                    new_hand = {
+                        "cards": [c2, deal()],
+                        "bet": h["bet"],
+                        "done": False,
+                        "split": True,
+                        "split_aces": c2.rank == "A",
+                        "surrendered": False,
+                    }
+                    observe(h["cards"][1])
+                    observe(new_hand["cards"][1])
+                    hands.append(new_hand)
+                    splits += 1
+                    continue
+                # Played on its total, as the strategy plays it
+                action = strategy.get_action(hand, up, split=False)
+
+            if h["split_aces"]:
+                h["done"] = True
+                i += 1
+                continue
+
+            if action == "r":
+                # Only strategies built for surrender say "r", and only
+                # the opening two-card hand may take it
+                if len(hands) == 1 and len(hand) == 2:
+                    h["surrendered"] = h["done"] = True
+                    i += 1
+                    continue
+                action = "h"
+
+            if action == "d":
+                two = len(hand) == 2
+                if (h["split"], two, score) in can_double and sim.balance >= h["bet"]:
+                    h["bet"] *= 2
+                    card = deal()
+                    observe(card)
+                    hand.append(card)
+                    h["done"] = True
+                    i += 1
+                    continue
+                # Refused: played as the strategy plays it without a double
+                action = strategy.get_action(hand, up, split=False, double=False)
+
+            if action == "h":
+                card = deal()
+                observe(card)
+                hand.append(card)
+            else:
+                h["done"] = True
+                i += 1
+
+        # Dealer play
+        observe(dealer[1])
+        while not dealer_stands(dealer):
+            card = deal()
+            observe(card)
+            dealer.append(card)
+
+        settlement(hands, dealer)
+
+    return play_round
+
+
+# --- 4. Verification ---
+def verify(seeds=range(5), rounds=20000):
+    """With the classic rules the specialised loop plays exactly like Simulation."""
+    from demi_god_logic import Simulation
+
+    failed = []
+    for seed in seeds:
+        ref = Simulation(seed=seed, bankroll=10**9)
+        sim = Simulation(seed=seed, bankroll=10**9)
+        sim.play_round = build_round(sim, Rules())
+        for _ in range(rounds):
+            ref.play_round()
+            sim.play_round()
+        got = (sim.balance, sim.counter.running_count, sim.reshuffles)
+        want = (ref.balance, ref.counter.running_count, ref.reshuffles)
+        print(f"Seed {seed}: {'identical' if got == want else f'MISMATCH {got} != {want}'}")
+        if got != want:
+            failed.append(seed)
+    if failed:
+        raise AssertionError(f"the specialised loop differs on seeds {failed}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import io
+    import json
+    import time
+    from contextlib import redirect_stdout
+
+    from demi_god_logic import CardCounter, ChartStrategy, IndexStrategy, Simulation
+
+    parser = argparse.ArgumentParser(description="Simulate under a rule set")
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--rounds", type=int, default=100000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--h17", action="store_true")
+    parser.add_argument("--no-das", action="store_true")
+    parser.add_argument("--max-splits", type=int)
+    parser.add_argument("--no-resplit-aces", action="store_true")
+    parser.add_argument("--double-on", default="any", help='"any", "two" or e.g. "9,10,11"')
+    parser.add_argument("--surrender", action="store_true", help="needs a --chart")
+    parser.add_argument(
+        "--insurance", action="store_true", help="needs a deviation_gen.py --chart"
+    )
+    parser.add_argument("--payout", type=float, default=BLACKJACK_PAYOUT)
+    parser.add_argument("--no-peek", action="store_true")
+    parser.add_argument("--chart", help="strategy_gen.py / deviation_gen.py chart")
+    args = parser.parse_args()
+
+    if args.verify:
+        verify()
+    else:
+        double_on = args.double_on
+        if double_on not in ("any", "two"):
+            double_on = tuple(int(t) for t in double_on.split(","))
+        rules = Rules(
+            h17=args.h17,
+            das=not args.no_das,
+            max_splits=args.max_splits,
+            resplit_aces=not args.no_resplit_aces,
+            double_on=double_on,
+            surrender=args.surrender,
+            insurance=args.insurance,
+            payout=args.payout,
+            peek=not args.no_peek,
+        )
+        # The built-in strategy never surrenders or insures, so those rules
+        # only mean something with a chart that does
+        counter = CardCounter()
+        strategy = StrategyEngine
+        chart = {}
+        if args.chart:
+            with open(args.chart, "r") as f:
+                chart = json.load(f)
+            if "deviations" in chart:
+                strategy = IndexStrategy(chart, counter, args.surrender)
+            else:
+                strategy = ChartStrategy(chart, args.surrender)
+        if args.surrender and not chart.get("rules", {}).get("surrender"):
+            parser.error("--surrender needs a --chart solved with surrender")
+        if args.insurance and chart.get("insurance") is None:
+            parser.error("--insurance needs a deviation_gen.py --chart with an index")
+        sim = Simulation(
+            seed=args.seed,
+            bankroll=10**9,
+            counter=counter,
+            strategy=strategy,
+            rules=rules,
+        )
+        start = time.time()
+        with redirect_stdout(io.StringIO()):
+            sim.run(args.rounds)
+        elapsed = time.time() - start
+        print(rules)
+        print(f"EV per round: ${(sim.balance - 10**9) / args.rounds:.3f}")
+        print(f"{args.rounds / elapsed:,.0f} rounds/s")
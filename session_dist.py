@@ -0,0 +1,266 @@
+import cmath
+import json
+import math
+import time
+
+from demi_god_logic import MAX_BET_UNITS, MIN_BET, NUM_DECKS, Simulation
+from distributed_sim import WORKER_BANKROLL
+from sim_stats import TC_CLAMP
+
+# Optional: with numpy a query takes milliseconds. The pure-Python FFT
+# used without it takes about 0.1s for 100 rounds, 1s for 500 and 1-3s
+# for 1000 at the default ramp (longer sessions, longer transforms).
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# --- Configuration ---
+DIST_FILE = "_session_dist.json"
+ESTIMATE_ROUNDS = 1000000
+LENGTHS = (100, 500, 1000)  # Session lengths in rounds
+LOSS = -2000  # Dollars: "how likely am I to be down more than this"
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def default_ramp(max_units=MAX_BET_UNITS):
+    """CardCounter's ramp, {lowest bucket: units}: one unit per true count."""
+    return {-TC_CLAMP: 1, **{tc: tc for tc in range(2, max_units + 1)}}
+
+
+def parse_ramp(spec):
+    """ "-10:0,2:2,4:6" -> {-10: 0, 2: 2, 4: 6}, units from each bucket up."""
+    return {int(k): int(v) for k, v in (part.split(":") for part in spec.split(","))}
+
+
+# --- 1. FFT ---
+def fft(values, invert=False):
+    """Iterative radix-2 FFT of a list whose length is a power of two."""
+    n = len(values)
+    a = list(values)
+    j = 0
+    for i in range(1, n):
+        bit = n >> 1
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+        j |= bit
+        if i < j:
+            a[i], a[j] = a[j], a[i]
+    sign = 1 if invert else -1
+    roots = [cmath.exp(sign * 2j * math.pi * k / n) for k in range(n // 2)]
+    length = 2
+    while length <= n:
+        half = length // 2
+        step = n // length
+        for start in range(0, n, length):
+            k = 0
+            for i in range(start, start + half):
+                t = a[i + half] * roots[k]
+                a[i + half] = a[i] - t
+                a[i] += t
+                k += step
+        length *= 2
+    if invert:
+        a = [x / n for x in a]
+    return a
+
+
+def _power_convolve(pmf, times, size, cache, key):
+    """pmf convolved with itself `times` times, on `size` points (numpy if there)."""
+    spectrum = cache.get(key)
+    if np is not None:
+        if spectrum is None:
+            spectrum = cache[key] = np.fft.rfft(np.array(pmf, dtype=float), size)
+        return np.fft.irfft(spectrum**times, size).tolist()
+    if spectrum is None:
+        spectrum = cache[key] = fft(pmf + [0.0] * (size - len(pmf)))
+    return [x.real for x in fft([x**times for x in spectrum], invert=True)]
+
+
+# --- 2. Per-round distributions ---
+def estimate(rounds=ESTIMATE_ROUNDS, seed=None, num_decks=NUM_DECKS, shuffle_at=None):
+    """
+    Plays `rounds` rounds and counts, per true count bucket, each result
+    in half-units of the bet (a blackjack is 3, a lost double -4). With
+    a bankroll that never runs short the result per unit does not depend
+    on the bet, so any ramp can be applied to these counts afterwards.
+    """
+    kwargs = {} if shuffle_at is None else {"shuffle_at": shuffle_at}
+    sim = Simulation(seed=seed, bankroll=WORKER_BANKROLL, num_decks=num_decks, **kwargs)
+    counter = sim.counter
+    counts = {}
+    for _ in range(rounds):
+        before = sim.balance
+        sim.play_round()
+        bucket = max(-TC_CLAMP, min(TC_CLAMP, math.floor(counter.true_count)))
+        half_units = round(2 * (sim.balance - before) / counter.get_bet())
+        by_result = counts.setdefault(bucket, {})
+        by_result[half_units] = by_result.get(half_units, 0) + 1
+    return {"rounds": rounds, "decks": num_decks, "counts": counts}
+
+
+class SessionDist:
+    """Distribution of a session's net result, on a lattice `step` dollars apart."""
+
+    def __init__(self, start, probs, step):
+        self.start = start  # Lattice index of probs[0]
+        self.probs = probs
+        self.step = step
+
+    def value(self, i):
+        return (self.start + i) * self.step
+
+    def mean(self):
+        return sum(p * self.value(i) for i, p in enumerate(self.probs))
+
+    def sd(self):
+        mean = self.mean()
+        var = sum(p * (self.value(i) - mean) ** 2 for i, p in enumerate(self.probs))
+        return math.sqrt(var)
+
+    def prob_below(self, dollars):
+        """P(net < dollars)."""
+        return sum(p for i, p in enumerate(self.probs) if self.value(i) < dollars)
+
+    def quantile(self, q):
+        seen = 0.0
+        for i, p in enumerate(self.probs):
+            seen += p
+            if seen >= q:
+                return self.value(i)
+        return self.value(len(self.probs) - 1)
+
+
+class SessionModel:
+    """
+    Session outcomes from one cached set of per-round distributions.
+
+    A ramp turns the per-bucket counts into one round's net result in
+    dollars; a session of N rounds is that convolved with itself N times,
+    done as one FFT, a power and an inverse FFT (the forward transform is
+    cached per ramp and size). Rounds are treated as independent draws of
+    the round mixture: the count's drift within a shoe is not modelled,
+    which `check` measures against whole simulated sessions.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.counts = {
+            int(bucket): {int(k): n for k, n in by_result.items()}
+            for bucket, by_result in data["counts"].items()
+        }
+        self.rounds = sum(n for by in self.counts.values() for n in by.values())
+        self.spectra = {}
+
+    @classmethod
+    def load(cls, path=DIST_FILE):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def save(self, path=DIST_FILE):
+        with open(path, "w") as f:
+            json.dump(self.data, f)
+
+    def units(self, ramp, bucket):
+        best = None
+        for low, units in ramp.items():
+            if low <= bucket and (best is None or low > best[0]):
+                best = (low, units)
+        return best[1] if best else ramp[min(ramp)]
+
+    def round_pmf(self, ramp):
+        """One round's net as (lowest half-unit index, probabilities) under a ramp."""
+        mass = {}
+        for bucket, by_result in self.counts.items():
+            units = self.units(ramp, bucket)
+            for k, n in by_result.items():
+                mass[k * units] = mass.get(k * units, 0) + n
+        low, high = min(mass), max(mass)
+        pmf = [0.0] * (high - low + 1)
+        for k, n in mass.items():
+            pmf[k - low] = n / self.rounds
+        return low, pmf
+
+    def session(self, rounds, ramp=None, unit=MIN_BET):
+        ramp = ramp or default_ramp()
+        low, pmf = self.round_pmf(ramp)
+        span = rounds * (len(pmf) - 1) + 1
+        size = 1 << (span - 1).bit_length()
+        key = (tuple(sorted(ramp.items())), size)
+        probs = _power_convolve(pmf, rounds, size, self.spectra, key)[:span]
+        probs = [max(p, 0.0) for p in probs]  # FFT round-off
+        return SessionDist(rounds * low, probs, unit / 2)
+
+
+# --- 3. Check ---
+def check(model, rounds=500, sessions=2000, seed=None, unit=MIN_BET):
+    """Quantiles of simulated sessions next to the convolved ones (default ramp)."""
+    sim = Simulation(
+        seed=seed, bankroll=WORKER_BANKROLL, num_decks=model.data.get("decks", NUM_DECKS)
+    )
+    scale = unit / MIN_BET
+    results = []
+    for _ in range(sessions):
+        before = sim.balance
+        for _ in range(rounds):
+            sim.play_round()
+        results.append((sim.balance - before) * scale)
+    results.sort()
+    dist = model.session(rounds, unit=unit)
+    print(f"{sessions} simulated sessions of {rounds} rounds vs convolution")
+    print(f"  {'':>5} {'Simulated':>10} {'Convolved':>10}")
+    for q in QUANTILES:
+        simulated = results[min(int(q * sessions), sessions - 1)]
+        print(f"  {f'{100 * q:.0f}%':>5} {simulated:>10,.0f} {dist.quantile(q):>10,.0f}")
+    mean = sum(results) / sessions
+    sd = math.sqrt(sum((x - mean) ** 2 for x in results) / (sessions - 1))
+    print(f"  {'mean':>5} {mean:>10,.0f} {dist.mean():>10,.0f}")
+    print(f"  {'sd':>5} {sd:>10,.0f} {dist.sd():>10,.0f}")
+
+
+def report(model, lengths, ramp, unit, loss):
+    print(f"From {model.rounds:,} simulated rounds, ramp {ramp}, ${unit} units\n")
+    header = " ".join(f"{f'{100 * q:.0f}%':>9}" for q in QUANTILES)
+    print(f"{'Rounds':>7} {'Mean':>9} {'SD':>9} {header} {f'P(<{loss:,})':>12} {'ms':>6}")
+    for rounds in lengths:
+        start = time.perf_counter()
+        dist = model.session(rounds, ramp, unit)
+        quantiles = " ".join(f"{dist.quantile(q):>9,.0f}" for q in QUANTILES)
+        p = dist.prob_below(loss)
+        ms = 1000 * (time.perf_counter() - start)
+        print(
+            f"{rounds:>7} {dist.mean():>9,.0f} {dist.sd():>9,.0f}"
+            f" {quantiles} {100 * p:>11.2f}% {ms:>6.0f}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Session outcome distributions")
+    parser.add_argument("command", choices=["estimate", "query", "check"])
+    parser.add_argument("--file", default=DIST_FILE)
+    parser.add_argument("--rounds", type=int, default=ESTIMATE_ROUNDS)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--decks", type=int, default=NUM_DECKS)
+    parser.add_argument("--lengths", default=",".join(map(str, LENGTHS)))
+    parser.add_argument("--ramp", help="units from each TC bucket up: --ramp=-10:1,2:2,4:6")
+    parser.add_argument("--unit", type=float, default=MIN_BET, help="dollars per unit")
+    parser.add_argument("--loss", type=float, default=LOSS)
+    parser.add_argument("--sessions", type=int, default=2000, help="for check")
+    args = parser.parse_args()
+
+    if args.command == "estimate":
+        start = time.time()
+        SessionModel(estimate(args.rounds, args.seed, args.decks)).save(args.file)
+        print(f"{args.rounds:,} rounds in {time.time() - start:.1f}s, saved to {args.file}")
+    elif args.command == "query":
+        ramp = parse_ramp(args.ramp) if args.ramp else default_ramp()
+        lengths = [int(n) for n in args.lengths.split(",")]
+        report(SessionModel.load(args.file), lengths, ramp, args.unit, args.loss)
+    else:
+        rounds = int(args.lengths.split(",")[0])
+        model = SessionModel.load(args.file)
+        check(model, rounds, args.sessions, args.seed, args.unit)
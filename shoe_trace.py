@@ -0,0 +1,261 @@
+import mmap
+import random
+import struct
+import time
+import zlib
+
+from demi_god_logic import NUM_DECKS, Card, Shoe
+
+
+# --- Configuration ---
+TRACE_FILE = "_shoes.trace"
+SHOES_PER_BLOCK = 256  # Shoes compressed together, the unit of random access
+LEVEL = 6  # zlib level
+# Rank order of Shoe.build; a card is stored as its index here, 4 bits
+RANKS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+RANK_INDEX = {r: i for i, r in enumerate(RANKS)}
+
+# File layout, all little-endian:
+#   header  magic, version, decks, shoes per block
+#   blocks  zlib of the block's shoes, two cards per byte, high nibble first
+#   index   offset of every block, plus where the last one ends
+#   footer  index offset, shoes, blocks, magic
+MAGIC = b"BJSHOES1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+FOOTER = struct.Struct("<QQI8s")
+
+# Nibble unpacking by bytes.translate, no per-card Python work
+_HIGH = bytes(b >> 4 for b in range(256))
+_LOW = bytes(b & 15 for b in range(256))
+_VALUES = bytes([Card(r, "Spades").value for r in RANKS] + [0] * (256 - len(RANKS)))
+
+
+# --- 1. Writing ---
+class TraceWriter:
+    """Appends shoes to a trace file. Use as a context manager or call close()."""
+
+    def __init__(
+        self, path, num_decks=NUM_DECKS, shoes_per_block=SHOES_PER_BLOCK, level=LEVEL
+    ):
+        self.file = open(path, "wb")
+        self.num_decks = num_decks
+        self.shoes_per_block = shoes_per_block
+        self.level = level
+        self.shoes = 0
+        self.pending = bytearray()
+        self.offsets = []
+        self.file.write(HEADER.pack(MAGIC, VERSION, num_decks, shoes_per_block))
+
+    def add(self, ranks):
+        """One shoe as rank indices, in Shoe.cards order (dealt from the end)."""
+        cards = 52 * self.num_decks
+        if len(ranks) != cards:
+            raise ValueError(f"A {self.num_decks} deck shoe has {cards} cards, got {len(ranks)}")
+        ranks = bytes(ranks)
+        self.pending += bytes(hi << 4 | lo for hi, lo in zip(ranks[0::2], ranks[1::2]))
+        self.shoes += 1
+        if self.shoes % self.shoes_per_block == 0:
+            self._flush()
+
+    def add_cards(self, cards):
+        self.add([RANK_INDEX[c.rank] for c in cards])
+
+    def _flush(self):
+        if self.pending:
+            self.offsets.append(self.file.tell())
+            self.file.write(zlib.compress(bytes(self.pending), self.level))
+            self.pending = bytearray()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self._flush()
+        index_offset = self.file.tell()
+        blocks = len(self.offsets)
+        self.file.write(struct.pack(f"<{blocks + 1}Q", *self.offsets, index_offset))
+        self.file.write(FOOTER.pack(index_offset, self.shoes, blocks, MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def record(path=TRACE_FILE, shoes=10000, seed=None, num_decks=NUM_DECKS):
+    """The shoes a Simulation with this seed would shuffle, in order."""
+    shoe = Shoe(random.Random(seed), num_decks)
+    with TraceWriter(path, num_decks) as writer:
+        for i in range(shoes):
+            if i:
+                shoe.build()
+            writer.add_cards(shoe.cards)
+
+
+# --- 2. Reading ---
+class TraceReader:
+    """
+    Memory-mapped trace. Only the block holding the requested shoe is
+    decompressed, and the last one is kept, so sequential replay inflates
+    each block once.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.num_decks, self.shoes_per_block = HEADER.unpack_from(
+            self.data, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} shoe trace")
+        index_offset, self.shoes, blocks, magic = FOOTER.unpack_from(
+            self.data, len(self.data) - FOOTER.size
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated (no footer)")
+        self.offsets = struct.unpack_from(f"<{blocks + 1}Q", self.data, index_offset)
+        self.shoe_bytes = 26 * self.num_decks
+        self.block_id = None
+        self.block = b""
+
+    def __len__(self):
+        return self.shoes
+
+    def ranks(self, i):
+        """Shoe i as bytes of rank indices."""
+        if not 0 <= i < self.shoes:
+            raise IndexError(f"shoe {i} of {self.shoes}")
+        block_id, pos = divmod(i, self.shoes_per_block)
+        if block_id != self.block_id:
+            start, end = self.offsets[block_id], self.offsets[block_id + 1]
+            self.block = zlib.decompress(self.data[start:end])
+            self.block_id = block_id
+        packed = self.block[pos * self.shoe_bytes : (pos + 1) * self.shoe_bytes]
+        out = bytearray(2 * len(packed))
+        out[0::2] = packed.translate(_HIGH)
+        out[1::2] = packed.translate(_LOW)
+        return bytes(out)
+
+    def values(self, i):
+        """Shoe i as card values, Ace = 11, as fast_kernel uses them."""
+        return list(self.ranks(i).translate(_VALUES))
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- 3. Replay ---
+class TraceShoe:
+    """
+    Drop-in for demi_god_logic.Shoe that deals the trace's shoes in order
+    instead of shuffling. Suits are not stored, every card is a Spade.
+    Raises EOFError when the trace runs out, unless loop=True.
+    """
+
+    CARDS = [Card(r, "Spades") for r in RANKS]
+
+    def __init__(self, reader, start=0, loop=False):
+        self.reader = reader
+        self.num_decks = reader.num_decks
+        self.position = start
+        self.loop = loop
+        self.cards = []
+        self.build()
+
+    def build(self):
+        if self.position >= len(self.reader):
+            if not self.loop:
+                raise EOFError(f"trace ran out after {len(self.reader)} shoes")
+            self.position = 0
+        self.cards = list(map(self.CARDS.__getitem__, self.reader.ranks(self.position)))
+        self.position += 1
+
+    def deal(self):
+        if not self.cards:
+            self.build()
+        return self.cards.pop()
+
+    def decks_remaining(self):
+        return len(self.cards) / 52
+
+
+# --- 4. Verification ---
+def verify(path, seed, rounds=20000):
+    """A trace recorded from a seed replays exactly what that seed plays."""
+    from demi_god_logic import Simulation
+    from fast_kernel import FastSimulation
+
+    with TraceReader(path) as reader:
+        ref = Simulation(seed=seed, bankroll=10**9, num_decks=reader.num_decks)
+        replay = Simulation(bankroll=10**9, shoe=TraceShoe(reader))
+        kernel = FastSimulation(bankroll=10**9, trace=reader)
+        for _ in range(rounds):
+            ref.play_round()
+            replay.play_round()
+        kernel.play(rounds)
+        want = (ref.balance, ref.reshuffles)
+        failed = []
+        for name, sim in (("replay", replay), ("kernel", kernel)):
+            got = (sim.balance, sim.reshuffles)
+            status = "OK" if got == want else f"MISMATCH, seed gives {want}"
+            print(f"{name}: balance {got[0]}, shuffles {got[1]} {status}")
+            if got != want:
+                failed.append(name)
+    if failed:
+        raise AssertionError(f"{', '.join(failed)} differ from seed {seed}")
+
+
+def bench(path, shoes=2000):
+    """Seconds per shoe: shuffling a fresh one vs reading it from the trace."""
+    with TraceReader(path) as reader:
+        shoes = min(shoes, len(reader))
+        shoe = Shoe(random.Random(0), reader.num_decks)
+        start = time.perf_counter()
+        for _ in range(shoes):
+            shoe.build()
+        shuffled = (time.perf_counter() - start) / shoes
+        replay = TraceShoe(reader)
+        start = time.perf_counter()
+        for _ in range(shoes - 1):
+            replay.build()
+        traced = (time.perf_counter() - start) / max(shoes - 1, 1)
+    print(f"Shoe.build {shuffled * 1e6:.0f}us, trace {traced * 1e6:.0f}us per shoe")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Record and replay shoe traces")
+    parser.add_argument("command", choices=["record", "info", "verify", "bench"])
+    parser.add_argument("--file", default=TRACE_FILE)
+    parser.add_argument("--shoes", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--decks", type=int, default=NUM_DECKS)
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        start = time.time()
+        record(args.file, args.shoes, args.seed, args.decks)
+        size = os.path.getsize(args.file)
+        bits = 8 * size / (args.shoes * 52 * args.decks)
+        print(f"{args.shoes} shoes in {size:,} bytes ({bits:.2f} bits per card)")
+        print(f"Took {time.time() - start:.1f}s")
+    elif args.command == "info":
+        with TraceReader(args.file) as reader:
+            blocks = len(reader.offsets) - 1
+            print(f"{len(reader)} shoes of {reader.num_decks} decks in {blocks} blocks")
+    elif args.command == "verify":
+        verify(args.file, args.seed, args.rounds)
+    else:
+        bench(args.file, args.shoes)
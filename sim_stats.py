@@ -0,0 +1,281 @@
+import math
+
+
+# --- Configuration ---
+NET_RANGE = (-1000, 1000)  # Per-round net result histogram, in dollars
+BET_RANGE = (0, 1000)
+HIST_BINS = 200
+TC_CLAMP = 10
+SKETCH_ACCURACY = 0.01  # Relative error of drawdown quantiles
+SKETCH_MAX_BINS = 2048
+
+
+# --- 1. Building Blocks ---
+class RunningStats:
+    """Welford mean / variance. Two of them merge with Chan's formula."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+
+    def add(self, x):
+        self.n += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.total += other.total
+        return self
+
+    @property
+    def sum_sq(self):
+        """Sum of squares, for stores that pool runs by plain sums."""
+        return self.m2 + self.n * self.mean * self.mean
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def stderr(self):
+        return math.sqrt(self.variance / self.n) if self.n > 1 else 0.0
+
+    def to_dict(self):
+        return {"n": self.n, "mean": self.mean, "m2": self.m2, "total": self.total}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.n = data["n"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.total = data["total"]
+        return stats
+
+
+class FixedHistogram:
+    """Equal-width bins over [lo, hi) plus an underflow and an overflow bin."""
+
+    def __init__(self, lo, hi, bins=HIST_BINS):
+        self.lo = lo
+        self.hi = hi
+        self.width = (hi - lo) / bins
+        self.counts = [0] * (bins + 2)
+
+    def add(self, x):
+        if x < self.lo:
+            self.counts[0] += 1
+        elif x >= self.hi:
+            self.counts[-1] += 1
+        else:
+            self.counts[1 + int((x - self.lo) / self.width)] += 1
+
+    def merge(self, other):
+        if (other.lo, other.hi, len(other.counts)) != (self.lo, self.hi, len(self.counts)):
+            raise ValueError("Histograms have different bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        return self
+
+    def bins(self):
+        """(bin start, count) pairs, None marking under- and overflow."""
+        edges = [None] + [self.lo + i * self.width for i in range(len(self.counts) - 2)]
+        return list(zip(edges + [None], self.counts))
+
+    def to_dict(self):
+        return {"lo": self.lo, "hi": self.hi, "counts": self.counts}
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls(data["lo"], data["hi"], len(data["counts"]) - 2)
+        hist.counts = list(data["counts"])
+        return hist
+
+
+class QuantileSketch:
+    """
+    Log-bucketed sketch of non-negative values (DDSketch style).
+    Quantiles are within SKETCH_ACCURACY relative error; once more than
+    max_bins buckets exist the smallest ones are folded together, so the
+    upper tail we care about for drawdowns stays accurate.
+    """
+
+    def __init__(self, accuracy=SKETCH_ACCURACY, max_bins=SKETCH_MAX_BINS):
+        self.accuracy = accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.zeros = 0
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, x):
+        self.count += 1
+        if x <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(x) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        if len(self.buckets) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.buckets)
+        low, keep = keys[0], keys[1]
+        self.buckets[keep] += self.buckets.pop(low)
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches have different accuracy")
+        self.zeros += other.zeros
+        self.count += other.count
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        while len(self.buckets) > self.max_bins:
+            self._collapse()
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma**key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            "accuracy": self.accuracy,
+            "max_bins": self.max_bins,
+            "zeros": self.zeros,
+            "count": self.count,
+            "buckets": {str(k): n for k, n in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["accuracy"], data["max_bins"])
+        sketch.zeros = data["zeros"]
+        sketch.count = data["count"]
+        sketch.buckets = {int(k): n for k, n in data["buckets"].items()}
+        return sketch
+
+
+# --- 2. The Stats Layer ---
+class StreamingStats:
+    """
+    Everything we want from a run, in memory that does not grow with it:
+    net result and bet (moments + histograms), per true count moments,
+    and a sketch of the bankroll drawdown seen after every round.
+    """
+
+    def __init__(self):
+        self.net = RunningStats()
+        self.bet = RunningStats()
+        self.net_hist = FixedHistogram(*NET_RANGE)
+        self.bet_hist = FixedHistogram(*BET_RANGE)
+        self.per_count = {}
+        self.drawdown = QuantileSketch()
+        self.peak = None
+        self.max_drawdown = 0
+
+    def record(self, net, bet, true_count, balance=None):
+        """One round. Without a balance the drawdown is not followed."""
+        self.net.add(net)
+        self.bet.add(bet)
+        self.net_hist.add(net)
+        self.bet_hist.add(bet)
+
+        bucket = max(-TC_CLAMP, min(TC_CLAMP, math.floor(true_count)))
+        stats = self.per_count.get(bucket)
+        if stats is None:
+            stats = self.per_count[bucket] = RunningStats()
+        stats.add(net)
+
+        if balance is None:
+            return
+        if self.peak is None or balance > self.peak:
+            self.peak = balance
+        drawdown = self.peak - balance
+        self.drawdown.add(drawdown)
+        if drawdown > self.max_drawdown:
+            self.max_drawdown = drawdown
+
+    def merge(self, other):
+        """
+        Folds in another run's stats. Drawdowns are per run, so the
+        merged sketch is the pooled distribution, the max is the worst run
+        and the peak the highest bankroll any run reached.
+        """
+        self.net.merge(other.net)
+        self.bet.merge(other.bet)
+        self.net_hist.merge(other.net_hist)
+        self.bet_hist.merge(other.bet_hist)
+        for bucket, stats in other.per_count.items():
+            self.per_count.setdefault(bucket, RunningStats()).merge(stats)
+        self.drawdown.merge(other.drawdown)
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown)
+        if other.peak is not None and (self.peak is None or other.peak > self.peak):
+            self.peak = other.peak
+        return self
+
+    def to_dict(self):
+        return {
+            "net": self.net.to_dict(),
+            "bet": self.bet.to_dict(),
+            "net_hist": self.net_hist.to_dict(),
+            "bet_hist": self.bet_hist.to_dict(),
+            "per_count": {str(b): s.to_dict() for b, s in self.per_count.items()},
+            "drawdown": self.drawdown.to_dict(),
+            "peak": self.peak,
+            "max_drawdown": self.max_drawdown,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.net = RunningStats.from_dict(data["net"])
+        stats.bet = RunningStats.from_dict(data["bet"])
+        stats.net_hist = FixedHistogram.from_dict(data["net_hist"])
+        stats.bet_hist = FixedHistogram.from_dict(data["bet_hist"])
+        stats.per_count = {
+            int(b): RunningStats.from_dict(s) for b, s in data["per_count"].items()
+        }
+        stats.drawdown = QuantileSketch.from_dict(data["drawdown"])
+        stats.peak = data["peak"]
+        stats.max_drawdown = data["max_drawdown"]
+        return stats
+
+    def report(self):
+        edge = self.net.total / self.bet.total if self.bet.total else 0.0
+        print(f"Rounds: {self.net.n}")
+        print(f"EV / round: ${self.net.mean:.3f} +/- {self.net.stderr:.3f}")
+        print(f"SD / round: ${math.sqrt(self.net.variance):.2f}")
+        print(f"Player edge: {edge * 100:.3f}%")
+        print(
+            "Drawdown  median ${:.0f} | 95% ${:.0f} | 99% ${:.0f} | max ${:.0f}".format(
+                self.drawdown.quantile(0.5),
+                self.drawdown.quantile(0.95),
+                self.drawdown.quantile(0.99),
+                self.max_drawdown,
+            )
+        )
+        print("TC   Rounds      EV/round")
+        for bucket in sorted(self.per_count):
+            s = self.per_count[bucket]
+            print(f"{bucket:+3d}  {s.n:<10d}  {s.mean:8.3f} +/- {s.stderr:.3f}")
@@ -0,0 +1,376 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from demi_god_logic import BLACKJACK_PAYOUT, NUM_DECKS
+
+
+# --- Configuration ---
+CHART_FILE = "_chart.json"
+
+DEFAULT_RULES = {
+    "decks": NUM_DECKS,
+    "h17": False,  # Dealer hits soft 17
+    "das": True,  # Double after split
+    "max_splits": 3,  # Resplits up to 4 hands
+    "surrender": False,  # Late surrender
+    "peek": True,  # Dealer checks for blackjack under a 10 or Ace
+    "payout": BLACKJACK_PAYOUT,
+    "double_on": None,  # Two-card totals a double is allowed on, None for any
+    "bj_beats_21": True,  # A dealer blackjack beats a player's drawn 21
+}
+
+# Card values as the simulator uses them, Ace = 11.
+VALUES = (2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+UPCARDS = VALUES
+
+# Dealer outcome slots: totals 17-21, bust, blackjack
+BUST = 5
+DEALER_BJ = 6
+
+
+def full_shoe(decks):
+    """Composition tuple: count of each value, tens (10/J/Q/K) lumped together."""
+    return tuple(4 * decks * (4 if v == 10 else 1) for v in VALUES)
+
+
+def remove(comp, *values):
+    comp = list(comp)
+    for v in values:
+        comp[v - 2] -= 1
+    return tuple(comp)
+
+
+def shoe_at_count(decks, cards_left, true_count):
+    """
+    A typical composition of `cards_left` cards at a Hi-Lo true count:
+    the full shoe scaled down, with low cards taken out and high cards
+    put back until the running count matches.
+    """
+    full = full_shoe(decks)
+    scale = cards_left / sum(full)
+    shift = true_count * cards_left / 52 / 2
+    low = sum(full[:5]) * scale
+    high = (full[8] + full[9]) * scale
+    comp = []
+    for v, count in zip(VALUES, full):
+        count *= scale
+        if v <= 6:
+            count *= max(low - shift, 0) / low
+        elif v >= 10:
+            count *= (high + shift) / high
+        comp.append(max(int(round(count)), 0))
+    return tuple(comp)
+
+
+def add_card(total, soft, value):
+    """Adds a card to a (total, soft) hand. Soft means an ace still counts 11."""
+    if value == 11:
+        if total + 11 <= 21:
+            return total + 11, True
+        value = 1
+    total += value
+    if total > 21 and soft:
+        return total - 10, False
+    return total, soft
+
+
+def hand_total(values):
+    total, soft = 0, False
+    for v in values:
+        total, soft = add_card(total, soft, v)
+    return total, soft
+
+
+# --- 1. Dealer ---
+@lru_cache(maxsize=1 << 18)
+def _dealer_draw(comp, total, soft, ncards, h17):
+    """Exact final-outcome probabilities for the dealer drawing from comp."""
+    if ncards == 2 and total == 21:
+        return (0, 0, 0, 0, 0, 0, 1.0)
+    if total > 21:
+        return (0, 0, 0, 0, 0, 1.0, 0)
+    if total >= 17 and not (h17 and soft and total == 17):
+        out = [0] * 7
+        out[total - 17] = 1.0
+        return tuple(out)
+
+    left = sum(comp)
+    result = [0.0] * 7
+    for i, count in enumerate(comp):
+        if not count:
+            continue
+        t, s = add_card(total, soft, VALUES[i])
+        nxt = list(comp)
+        nxt[i] -= 1
+        sub = _dealer_draw(tuple(nxt), t, s, ncards + 1, h17)
+        p = count / left
+        for k in range(7):
+            result[k] += p * sub[k]
+    return tuple(result)
+
+
+@lru_cache(maxsize=1 << 14)
+def dealer_outcomes(comp, up, h17, peek):
+    """
+    Dealer outcome distribution for an upcard, comp excluding the upcard.
+    With peek the dealer is known not to have blackjack, so it is conditioned out.
+    """
+    total, soft = add_card(0, False, up)
+    dist = list(_dealer_draw(comp, total, soft, 1, h17))
+    if peek and dist[DEALER_BJ]:
+        no_bj = 1.0 - dist[DEALER_BJ]
+        dist = [p / no_bj for p in dist[:DEALER_BJ]] + [0.0]
+    return tuple(dist)
+
+
+# --- 2. Player ---
+class HandSolver:
+    """
+    EVs of every action against one upcard on one shoe composition.
+    Total-dependent: the player's draws and the dealer's outcomes both
+    come from the composition given, whatever cards the player takes.
+    """
+
+    def __init__(self, comp, up, rules):
+        self.rules = rules
+        left = sum(comp)
+        self.probs = [(v, c / left) for v, c in zip(VALUES, comp) if c]
+        self.dealer = dealer_outcomes(comp, up, rules["h17"], rules["peek"])
+        self._stand = {}
+        self._best = {}
+        self._evs = {}
+
+    def stand(self, total):
+        if total > 21:
+            return -1.0
+        ev = self._stand.get(total)
+        if ev is None:
+            d = list(self.dealer)
+            if self.rules.get("bj_beats_21", True):
+                ev = d[BUST] - d[DEALER_BJ]
+            else:
+                # Scores are compared: a dealer blackjack is just a 21
+                ev = d[BUST]
+                d[21 - 17] += d[DEALER_BJ]
+            for dt in range(17, 22):
+                if total > dt:
+                    ev += d[dt - 17]
+                elif total < dt:
+                    ev -= d[dt - 17]
+            self._stand[total] = ev
+        return ev
+
+    def hit(self, total, soft):
+        ev = 0.0
+        for v, p in self.probs:
+            t, s = add_card(total, soft, v)
+            ev += p * (self.best(t, s) if t <= 21 else -1.0)
+        return ev
+
+    def best(self, total, soft):
+        """Best of hit and stand, with no double or split left."""
+        key = (total, soft)
+        ev = self._best.get(key)
+        if ev is None:
+            ev = self.stand(total)
+            if total < 21:
+                ev = max(ev, self.hit(total, soft))
+            self._best[key] = ev
+        return ev
+
+    def can_double(self, total):
+        double_on = self.rules.get("double_on")
+        return double_on is None or total in double_on
+
+    def double(self, total, soft):
+        ev = 0.0
+        for v, p in self.probs:
+            t, _ = add_card(total, soft, v)
+            ev += p * self.stand(t)
+        return 2 * ev
+
+    def split(self, value):
+        return 2 * self._split_hand(value, self.rules["max_splits"] - 1)
+
+    def _split_hand(self, value, splits_left):
+        """One hand after a split: the pair card plus one drawn card."""
+        ev = 0.0
+        for v, p in self.probs:
+            total, soft = hand_total((value, v))
+            if value == 11:
+                # Split aces get one card each, 21 is not a blackjack
+                ev += p * self.stand(total)
+                continue
+            play = self.best(total, soft)
+            if self.rules["das"] and self.can_double(total):
+                play = max(play, self.double(total, soft))
+            if v == value and splits_left > 0:
+                play = max(play, 2 * self._split_hand(value, splits_left - 1))
+            ev += p * play
+        return ev
+
+    def action_evs(self, total, soft, pair=None):
+        """EV of every legal action for a two-card hand. Do not modify the result."""
+        key = (total, soft, pair)
+        evs = self._evs.get(key)
+        if evs is not None:
+            return evs
+        evs = self._evs[key] = {"s": self.stand(total)}
+        if total < 21:
+            evs["h"] = self.hit(total, soft)
+            if self.can_double(total):
+                evs["d"] = self.double(total, soft)
+        if pair is not None:
+            evs["p"] = self.split(pair)
+        if self.rules["surrender"]:
+            evs["r"] = -0.5
+        return evs
+
+
+# --- 3. Chart ---
+def representative(kind, total):
+    """Two cards standing in for a chart cell."""
+    if kind == "pairs":
+        return (total, total)
+    if kind == "soft":
+        return (11, 11) if total == 12 else (11, total - 11)
+    if total == 4:
+        return (2, 2)
+    high = min(10, total - 2)
+    return (total - high, high)
+
+
+def chart_cells():
+    cells = []
+    for up in UPCARDS:
+        cells += [("hard", t, up) for t in range(4, 21)]
+        cells += [("soft", t, up) for t in range(12, 21)]
+        cells += [("pairs", v, up) for v in VALUES]
+    return cells
+
+
+def solve_cell(cell, rules):
+    kind, total, up = cell
+    cards = representative(kind, total)
+    comp = remove(full_shoe(rules["decks"]), up, *cards)
+    solver = HandSolver(comp, up, rules)
+    hand, soft = hand_total(cards)
+    pair = total if kind == "pairs" else None
+    evs = solver.action_evs(hand, soft, pair)
+    return cell, evs
+
+
+def chart_code(kind, evs):
+    """
+    Chart notation: H/S, P for split (- means play the total),
+    Dh/Ds double else hit/stand, Rh/Rs surrender else hit/stand.
+    """
+    best = max(evs, key=evs.get)
+    if kind == "pairs":
+        return "P" if best == "p" else "-"
+    fallback = "h" if evs.get("h", -2) > evs["s"] else "s"
+    if best == "d":
+        return "D" + fallback
+    if best == "r":
+        return "R" + fallback
+    return fallback.upper()
+
+
+def generate_chart(rules=None, workers=None):
+    """Solves every cell across a process pool and returns the chart dict."""
+    rules = dict(DEFAULT_RULES, **(rules or {}))
+    chart = {"rules": rules, "hard": {}, "soft": {}, "pairs": {}, "evs": {}}
+    cells = chart_cells()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(solve_cell, cells, [rules] * len(cells), chunksize=8)
+        for (kind, total, up), evs in results:
+            chart[kind].setdefault(str(total), {})[str(up)] = chart_code(kind, evs)
+            chart["evs"].setdefault(kind, {}).setdefault(str(total), {})[str(up)] = {
+                a: round(ev, 6) for a, ev in evs.items()
+            }
+
+    # Nothing to decide on 21
+    chart["hard"]["21"] = {str(up): "S" for up in UPCARDS}
+    chart["soft"]["21"] = {str(up): "S" for up in UPCARDS}
+    return chart
+
+
+def compare_with_builtin(chart):
+    """Cells where the hand-written StrategyEngine chart disagrees."""
+    from demi_god_logic import Card, StrategyEngine
+
+    ranks = {v: str(v) for v in VALUES}
+    ranks[11] = "A"
+    diffs = []
+    for kind, total, up in chart_cells():
+        cards = representative(kind, total)
+        hand = [Card(ranks[v], "Spades") for v in cards]
+        builtin = StrategyEngine.get_action(hand, Card(ranks[up], "Hearts"))
+        code = chart[kind][str(total)][str(up)]
+        if kind == "pairs":
+            wanted = "p" if code == "P" else None
+            if (builtin == "p") != (wanted == "p"):
+                diffs.append((kind, total, up, builtin, code))
+            continue
+        if builtin == "p":
+            continue
+        wanted = code[0].lower() if code[0] in "DR" else code.lower()
+        if wanted == "r":
+            wanted = code[1]
+        if builtin != wanted:
+            diffs.append((kind, total, up, builtin, code))
+    return diffs
+
+
+def print_chart(chart):
+    header = "      " + " ".join(f"{('A' if u == 11 else u):>3}" for u in UPCARDS)
+    for kind, rows in (("hard", range(4, 22)), ("soft", range(12, 22)), ("pairs", VALUES)):
+        print(f"\n{kind.upper()}\n{header}")
+        for t in rows:
+            label = f"{'A' if t == 11 else t},{'A' if t == 11 else t}" if kind == "pairs" else t
+            cells = " ".join(f"{chart[kind][str(t)][str(u)]:>3}" for u in UPCARDS)
+            print(f"{str(label):>5} {cells}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Basic strategy chart generator")
+    parser.add_argument("--decks", type=int, default=DEFAULT_RULES["decks"])
+    parser.add_argument("--h17", action="store_true")
+    parser.add_argument("--no-das", action="store_true")
+    parser.add_argument("--max-splits", type=int, default=DEFAULT_RULES["max_splits"])
+    parser.add_argument("--surrender", action="store_true")
+    parser.add_argument("--no-peek", action="store_true")
+    parser.add_argument("--payout", type=float, default=DEFAULT_RULES["payout"])
+    parser.add_argument("--double-on", help='two-card totals, e.g. "9,10,11"')
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--out", default=CHART_FILE)
+    args = parser.parse_args()
+
+    start = time.time()
+    result = generate_chart(
+        {
+            "decks": args.decks,
+            "h17": args.h17,
+            "das": not args.no_das,
+            "max_splits": args.max_splits,
+            "surrender": args.surrender,
+            "peek": not args.no_peek,
+            "payout": args.payout,
+            "double_on": args.double_on
+            and [int(t) for t in args.double_on.split(",")],
+        },
+        args.workers,
+    )
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=1)
+
+    print_chart(result)
+    print(f"\nSolved in {time.time() - start:.1f}s, saved to {args.out}")
+    diffs = compare_with_builtin(result)
+    print(f"{len(diffs)} cell(s) differ from the built-in chart:")
+    for kind, total, up, builtin, code in diffs:
+        print(f"  {kind} {total} vs {up}: built-in '{builtin}', generated '{code}'")
@@ -0,0 +1,240 @@
+import random
+import time
+
+from demi_god_logic import (
+    BLACKJACK_PAYOUT,
+    NUM_DECKS,
+    SHUFFLE_AT_DECKS_LEFT,
+    STARTING_MONEY,
+    CardCounter,
+    Shoe,
+    StrategyEngine,
+)
+
+
+# --- Configuration ---
+MAX_SEATS = 7
+
+
+# --- 1. Seats ---
+class Seat:
+    """One player at the table: own strategy, counter, bankroll and stats."""
+
+    def __init__(
+        self, strategy=StrategyEngine, counter=None, bankroll=STARTING_MONEY, stats=None
+    ):
+        self.strategy = strategy
+        self.counter = counter or CardCounter()
+        self.balance = bankroll
+        self.stats = stats
+        # Strategies only look at (pair, soft, total, two cards, upcard),
+        # so each seat remembers every decision it has ever made.
+        # Index play also reads the count, so it is asked every time.
+        self.decisions = None if getattr(strategy, "count_dependent", False) else {}
+
+    def decide(self, hand, up):
+        cards = hand["cards"]
+        if self.decisions is None:
+            return self.strategy.get_action(cards, up)
+        two = len(cards) == 2
+        pair = cards[0].value if two and cards[0].value == cards[1].value else 0
+        total = hand["total"]
+        # Soft, and an ace still counted 11 (charts call A,A,4 soft 16)
+        soft = hand["aces"] > 0 and hand["raw"] <= 21
+        eleven = hand["raw"] - total < 10 * hand["aces"]
+        key = (pair, soft, eleven, total, two, up.value)
+        action = self.decisions.get(key)
+        if action is None:
+            action = self.decisions[key] = self.strategy.get_action(cards, up)
+        return action
+
+
+def new_hand(cards, bet):
+    hand = {
+        "cards": [],
+        "bet": bet,
+        "raw": 0,
+        "aces": 0,
+        "total": 0,
+        "split_aces": False,
+    }
+    for card in cards:
+        add_card(hand, card)
+    return hand
+
+
+def add_card(hand, card):
+    """Keeps the hard sum and ace count, so the total never needs re-summing."""
+    hand["cards"].append(card)
+    hand["raw"] += card.value
+    if card.value == 11:
+        hand["aces"] += 1
+    total, aces = hand["raw"], hand["aces"]
+    while total > 21 and aces:
+        total -= 10
+        aces -= 1
+    hand["total"] = total
+
+
+# --- 2. The Table ---
+class Table:
+    """
+    1-7 seats sharing one shoe, dealt in casino order: a card to each seat
+    from first base, the dealer's upcard, a second card to each seat, then
+    the hole card. Every seat counts every card that hits the table.
+    """
+
+    def __init__(
+        self,
+        seats,
+        seed=None,
+        num_decks=NUM_DECKS,
+        shuffle_at=SHUFFLE_AT_DECKS_LEFT,
+        shoe=None,
+    ):
+        if not 1 <= len(seats) <= MAX_SEATS:
+            raise ValueError(f"A table has 1-{MAX_SEATS} seats, got {len(seats)}")
+        self.seats = seats
+        # Seats playing the same strategy share one decision memo
+        memos = {}
+        for seat in seats:
+            if seat.decisions is not None:
+                seat.decisions = memos.setdefault(seat.strategy, seat.decisions)
+        self.rng = random.Random(seed)
+        self.shoe = shoe or Shoe(self.rng, num_decks)
+        self.shuffle_at = shuffle_at
+        self.rounds = 0
+
+    def play_round(self):
+        shoe = self.shoe
+        seats = [s for s in self.seats if s.balance > 0]
+        if not seats:
+            return False
+
+        if shoe.decks_remaining() <= self.shuffle_at:
+            shoe.build()
+            for seat in self.seats:
+                seat.counter.reset()
+
+        decks_left = shoe.decks_remaining()
+        bets = []
+        for seat in seats:
+            seat.counter.update_true_count(decks_left)
+            bets.append(seat.counter.get_bet())
+        before = [seat.balance for seat in seats]
+
+        # Casino order: one pass for first cards, upcard, second pass, hole card
+        deal = shoe.deal
+        first = [deal() for _ in seats]
+        up = deal()
+        boxes = [[new_hand((c, deal()), bet)] for c, bet in zip(first, bets)]
+        hole = deal()
+        dealt = first + [up, hole] + [box[0]["cards"][1] for box in boxes]
+
+        dealer = new_hand((up, hole), 0)
+        dealer_bj = dealer["total"] == 21
+
+        if dealer_bj and up.value in (10, 11):
+            # Dealer peeks: every hand is settled, nobody plays
+            for seat, box, bet in zip(seats, boxes, bets):
+                if box[0]["total"] != 21:
+                    seat.balance -= bet
+        else:
+            live = False
+            for seat, box in zip(seats, boxes):
+                if box[0]["total"] == 21:
+                    seat.balance += int(box[0]["bet"] * BLACKJACK_PAYOUT)
+                    box[0]["settled"] = True
+                    continue
+                self._play_seat(seat, box, up, dealt)
+                live = live or any(h["total"] <= 21 for h in box)
+
+            # The dealer only draws if someone is still in the hand
+            if live:
+                while dealer["total"] < 17:
+                    card = deal()
+                    dealt.append(card)
+                    add_card(dealer, card)
+            self._settle(seats, boxes, dealer["total"])
+
+        # Everyone at the table saw the same cards, so count them once
+        delta = sum(c.count_value for c in dealt)
+        for seat in self.seats:
+            seat.counter.running_count += delta
+
+        for seat, bet, start in zip(seats, bets, before):
+            if seat.stats is not None:
+                seat.stats.record(
+                    seat.balance - start, bet, seat.counter.true_count, seat.balance
+                )
+        self.rounds += 1
+        return True
+
+    def _play_seat(self, seat, box, up, dealt):
+        deal = self.shoe.deal
+        i = 0
+        while i < len(box):
+            h = box[i]
+            if h["total"] >= 21:
+                i += 1
+                continue
+
+            action = seat.decide(h, up)
+            if action in ("p", "d") and seat.balance < h["bet"]:
+                action = "h"
+
+            if action == "p":
+                c1, c2 = h["cards"]
+                cards = [deal(), deal()]
+                dealt.extend(cards)
+                box[i] = new_hand((c1, cards[0]), h["bet"])
+                box[i]["split_aces"] = c1.value == 11
+                split = new_hand((c2, cards[1]), h["bet"])
+                split["split_aces"] = c2.value == 11
+                box.append(split)
+                continue
+
+            if h["split_aces"]:
+                i += 1
+                continue
+
+            if action == "h" or action == "d":
+                card = deal()
+                dealt.append(card)
+                add_card(h, card)
+                if action == "d":
+                    h["bet"] *= 2
+                    i += 1
+                continue
+
+            i += 1
+
+    def _settle(self, seats, boxes, d_score):
+        for seat, box in zip(seats, boxes):
+            for h in box:
+                if h.get("settled"):
+                    continue
+                p_score = h["total"]
+                if p_score > 21:
+                    seat.balance -= h["bet"]
+                elif d_score > 21 or p_score > d_score:
+                    seat.balance += h["bet"]
+                elif p_score < d_score:
+                    seat.balance -= h["bet"]
+
+    def run(self, rounds=100000):
+        for _ in range(rounds):
+            if not self.play_round():
+                break
+        for n, seat in enumerate(self.seats, 1):
+            print(f"Seat {n} final balance: ${seat.balance}")
+
+
+if __name__ == "__main__":
+    ROUNDS = 20000
+    for n in (1, 7):
+        table = Table([Seat(bankroll=10**9) for _ in range(n)], seed=1)
+        start = time.time()
+        table.run(ROUNDS)
+        took = time.time() - start
+        print(f"{n} seat(s): {ROUNDS / took:,.0f} rounds/s, {ROUNDS * n / took:,.0f} hands/s\n")
@@ -0,0 +1,184 @@
+import math
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# --- Configuration ---
+SAMPLE_EVERY = 4096  # Rounds between samples, must be a power of two
+CONSOLE_EVERY = 5.0  # Seconds between console lines
+METRICS_PORT = 9464  # What --metrics-port means with no number
+
+
+def memory_bytes():
+    """Resident memory of this process now, 0 where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def peak_memory_bytes():
+    """Peak resident memory of this process."""
+    if resource is None:
+        return 0
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class Telemetry:
+    """
+    Live progress of a long simulation.
+    The hot loop only tests `round & mask`; everything else happens once
+    per SAMPLE_EVERY rounds. The EV confidence interval uses batch means:
+    each sample window is one batch, so no per-round data is needed.
+    """
+
+    def __init__(
+        self, sample_every=SAMPLE_EVERY, console_every=CONSOLE_EVERY, port=None
+    ):
+        if sample_every & (sample_every - 1):
+            raise ValueError("sample_every must be a power of two")
+        self.mask = sample_every - 1
+        self.console_every = console_every
+        self.port = port
+        self.server = None
+        self.metrics = {}
+        self.total = 0
+
+    # --- Hot loop side ---
+    def start(self, sim, total_rounds):
+        self.total = total_rounds
+        self.started = self.last_print = time.monotonic()
+        self.start_balance = self.last_balance = sim.balance
+        self.last_round = 0
+        # Batch means of net result per round
+        self.batches = 0
+        self.batch_sum = 0.0
+        self.batch_sq = 0.0
+        if self.port is not None and self.server is None:
+            self._serve()
+        self.sample(sim, 0)
+
+    def sample(self, sim, done):
+        now = time.monotonic()
+        rounds = done - self.last_round
+        if rounds:
+            batch_mean = (sim.balance - self.last_balance) / rounds
+            self.batches += 1
+            self.batch_sum += batch_mean
+            self.batch_sq += batch_mean * batch_mean
+        self.last_round = done
+        self.last_balance = sim.balance
+
+        elapsed = now - self.started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        ev = (sim.balance - self.start_balance) / done if done else 0.0
+        ci = 0.0
+        if self.batches > 1:
+            mean = self.batch_sum / self.batches
+            var = max(self.batch_sq / self.batches - mean * mean, 0.0)
+            var *= self.batches / (self.batches - 1)
+            ci = 1.96 * math.sqrt(var / self.batches)
+
+        # Replaced whole, so the HTTP thread never sees a half-written dict
+        self.metrics = {
+            "rounds": done,
+            "rounds_target": self.total,
+            "rounds_per_second": rate,
+            "eta_seconds": (self.total - done) / rate if rate else 0.0,
+            "ev_per_round": ev,
+            "ev_ci95": ci,
+            "reshuffles": sim.reshuffles,
+            "balance": sim.balance,
+            "memory_bytes": memory_bytes(),
+            "peak_memory_bytes": peak_memory_bytes(),
+        }
+
+        if self.console_every and now - self.last_print >= self.console_every:
+            self.last_print = now
+            print(self.console_line())
+
+    def finish(self, sim, done):
+        self.sample(sim, done)
+        print(self.console_line())
+
+    # --- Reporting side ---
+    def console_line(self):
+        m = self.metrics
+        pct = 100 * m["rounds"] / m["rounds_target"] if m["rounds_target"] else 100
+        return (
+            f"[{pct:5.1f}%] {m['rounds']:,} rounds | {m['rounds_per_second']:,.0f}/s"
+            f" | ETA {m['eta_seconds']:.0f}s | EV ${m['ev_per_round']:.3f}"
+            f" +/- {m['ev_ci95']:.3f} | shuffles {m['reshuffles']}"
+            f" | mem {(m['memory_bytes'] or m['peak_memory_bytes']) / 2**20:.0f}MB"
+        )
+
+    def prometheus(self):
+        m = self.metrics
+        lines = []
+        for name, kind, help_text, value in (
+            ("blackjack_rounds_total", "counter", "Rounds played", m["rounds"]),
+            ("blackjack_rounds_target", "gauge", "Rounds requested", m["rounds_target"]),
+            ("blackjack_rounds_per_second", "gauge", "Speed", m["rounds_per_second"]),
+            ("blackjack_eta_seconds", "gauge", "Time left", m["eta_seconds"]),
+            ("blackjack_ev_per_round", "gauge", "Mean net result", m["ev_per_round"]),
+            ("blackjack_ev_ci95", "gauge", "95% CI half-width of EV", m["ev_ci95"]),
+            ("blackjack_reshuffles_total", "counter", "Shoes shuffled", m["reshuffles"]),
+            ("blackjack_balance", "gauge", "Current bankroll", m["balance"]),
+            ("process_resident_memory_bytes", "gauge", "RSS", m["memory_bytes"]),
+            (
+                "process_resident_memory_max_bytes",
+                "gauge",
+                "Peak RSS",
+                m["peak_memory_bytes"],
+            ),
+        ):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _serve(self):
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer(("127.0.0.1", self.port), MetricsHandler)
+        except OSError as e:
+            # A second run on the same port still runs, just without /metrics
+            print(f"Metrics not served on port {self.port}: {e}")
+            self.port = None
+            return
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
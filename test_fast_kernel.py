@@ -0,0 +1,64 @@
+import pytest
+
+from demi_god_logic import Simulation
+from distributed_sim import run_shard
+from fast_kernel import FastSimulation, jit_play_rounds, make_simulation
+from sim_stats import StreamingStats
+
+SEEDS = range(5)
+ROUNDS = 20000
+STEP = 997  # Compare state at odd points, not only on chunk boundaries
+
+
+def assert_same_play(seed, jit):
+    ref = Simulation(seed=seed, bankroll=10**9)
+    fast = FastSimulation(seed=seed, bankroll=10**9, jit=jit)
+    done = 0
+    while done < ROUNDS:
+        n = min(STEP, ROUNDS - done)
+        for _ in range(n):
+            ref.play_round()
+        assert fast.play(n) == n
+        done += n
+        got = (fast.balance, fast.running_count, fast.reshuffles)
+        want = (ref.balance, ref.counter.running_count, ref.reshuffles)
+        assert got == want, f"seed {seed}, round {done}"
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_python_kernel_matches_simulation(seed):
+    assert_same_play(seed, jit=False)
+
+
+@pytest.mark.skipif(jit_play_rounds is None, reason="numba is not installed")
+@pytest.mark.parametrize("seed", SEEDS)
+def test_numba_kernel_matches_simulation(seed):
+    assert_same_play(seed, jit=True)
+
+
+def test_shard_stats_match_simulation():
+    """run_shard gives the same numbers whichever simulator make_simulation picks."""
+    want = StreamingStats()
+    for seed in (3, 4):
+        sim = Simulation(seed=seed, bankroll=10**12)
+        run = StreamingStats()
+        for _ in range(2000):
+            before = sim.balance
+            sim.play_round()
+            counter = sim.counter
+            run.record(
+                sim.balance - before, counter.get_bet(), counter.true_count, sim.balance
+            )
+        want.merge(run)
+    assert run_shard(3, 5, 2000).to_dict() == want.to_dict()
+
+
+def test_make_simulation_falls_back_for_count_dependent_strategies():
+    class Indexed:
+        count_dependent = True
+
+        @staticmethod
+        def get_action(hand, up):
+            return "s"
+
+    assert type(make_simulation(seed=0, strategy=Indexed)) is Simulation
@@ -0,0 +1,467 @@
+import array
+import random
+
+from demi_god_logic import (
+    BLACKJACK_PAYOUT,
+    MAX_BET_UNITS,
+    NUM_DECKS,
+    SHUFFLE_AT_DECKS_LEFT,
+)
+from fast_kernel import ACTIONS, build_values, njit, np
+
+
+# --- Configuration ---
+MAX_HANDS = 16  # Split hands per round
+HIT, STAND, DOUBLE, SPLIT = ACTIONS["h"], ACTIONS["s"], ACTIONS["d"], ACTIONS["p"]
+
+# Observation columns, one row per table
+OBS_TOTAL, OBS_SOFT, OBS_PAIR, OBS_UP, OBS_TC, OBS_DECKS, OBS_TWO = range(7)
+OBS_SIZE = 7
+
+# Per-table state slots
+TOP, RUNNING, SPARE_USED, N_HANDS, CUR, UP, HOLE, PENDING, ROUNDS, RESHUFFLES = range(10)
+ENV_SIZE = 10
+TC, NET = range(2)  # Float slots: true count at the deal, net over every round
+ENVF_SIZE = 2
+# Per-hand slots; FLAGS bit 0 done, bit 1 split aces
+RAW, ACES, NCARDS, C1, C2, HBET, FLAGS = range(7)
+HAND_SIZE = 7
+
+# Compiled as a whole when numba is there, plain Python otherwise
+_jit = njit(cache=True) if njit is not None else (lambda f: f)
+
+
+# --- 1. Kernel pieces ---
+@_jit
+def _draw(e, shoes, spares, env, full):
+    """Top card of table e's shoe; an empty shoe is rebuilt from the spare."""
+    s = e * ENV_SIZE
+    if env[s + TOP] == 0:
+        for j in range(full):
+            shoes[e * full + j] = spares[e * full + j]
+        env[s + TOP] = full
+        env[s + SPARE_USED] = 1
+    env[s + TOP] -= 1
+    return shoes[e * full + env[s + TOP]]
+
+
+@_jit
+def _hilo(v):
+    return 1 if v <= 6 else (-1 if v >= 10 else 0)
+
+
+@_jit
+def _score(raw, aces):
+    while raw > 21 and aces > 0:
+        raw -= 10
+        aces -= 1
+    return raw
+
+
+@_jit
+def _new_hand(hands, h, c1, c2, bet, flags):
+    hands[h + RAW] = c1 + c2
+    hands[h + ACES] = (1 if c1 == 11 else 0) + (1 if c2 == 11 else 0)
+    hands[h + NCARDS] = 2
+    hands[h + C1] = c1
+    hands[h + C2] = c2
+    hands[h + HBET] = bet
+    hands[h + FLAGS] = flags
+
+
+@_jit
+def _observe(e, env, envf, hands, obs):
+    s = e * ENV_SIZE
+    h = (e * MAX_HANDS + env[s + CUR]) * HAND_SIZE
+    raw = hands[h + RAW]
+    two = hands[h + NCARDS] == 2
+    o = e * OBS_SIZE
+    obs[o + OBS_TOTAL] = _score(raw, hands[h + ACES])
+    # Soft as the simulator's strategy sees it: an ace and raw total <= 21
+    obs[o + OBS_SOFT] = 1 if hands[h + ACES] > 0 and raw <= 21 else 0
+    obs[o + OBS_PAIR] = hands[h + C1] if two and hands[h + C1] == hands[h + C2] else 0
+    obs[o + OBS_UP] = env[s + UP]
+    obs[o + OBS_TC] = envf[e * ENVF_SIZE + TC]
+    obs[o + OBS_DECKS] = env[s + TOP] / 52
+    obs[o + OBS_TWO] = 1 if two else 0
+
+
+@_jit
+def _next_decision(e, env, hands):
+    """Moves to the next hand that needs an action. False when none is left."""
+    s = e * ENV_SIZE
+    while env[s + CUR] < env[s + N_HANDS]:
+        h = (e * MAX_HANDS + env[s + CUR]) * HAND_SIZE
+        if not hands[h + FLAGS] & 1:
+            if _score(hands[h + RAW], hands[h + ACES]) >= 21:
+                hands[h + FLAGS] |= 1
+            elif hands[h + FLAGS] & 2 and hands[h + C2] != 11:
+                hands[h + FLAGS] |= 1  # Split aces take one card, unless resplit
+            else:
+                return True
+        env[s + CUR] += 1
+    return False
+
+
+@_jit
+def _finish_round(e, shoes, spares, env, envf, hands, full):
+    """Dealer play and settlement, as Simulation.play_round. Returns the net."""
+    s = e * ENV_SIZE
+    rc = env[s + RUNNING] + _hilo(env[s + HOLE])
+    d1 = env[s + UP]
+    d2 = env[s + HOLE]
+    raw = d1 + d2
+    aces = (1 if d1 == 11 else 0) + (1 if d2 == 11 else 0)
+    d_score = _score(raw, aces)
+    while d_score < 17:
+        v = _draw(e, shoes, spares, env, full)
+        rc += _hilo(v)
+        raw += v
+        if v == 11:
+            aces += 1
+        d_score = _score(raw, aces)
+    env[s + RUNNING] = rc
+
+    net = 0.0
+    for k in range(env[s + N_HANDS]):
+        h = (e * MAX_HANDS + k) * HAND_SIZE
+        p_score = _score(hands[h + RAW], hands[h + ACES])
+        if p_score > 21:
+            net -= hands[h + HBET]
+        elif d_score > 21 or p_score > d_score:
+            net += hands[h + HBET]
+        elif p_score < d_score:
+            net -= hands[h + HBET]
+    envf[e * ENVF_SIZE + NET] += net
+    env[s + ROUNDS] += 1
+    return net
+
+
+@_jit
+def _deal(e, shoes, spares, env, envf, hands, params, full):
+    """
+    Starts a round on table e. Returns True if it needs a decision,
+    False if it was settled on the deal (a blackjack either side).
+    """
+    s = e * ENV_SIZE
+    if env[s + TOP] / 52 <= params[0]:
+        for j in range(full):
+            shoes[e * full + j] = spares[e * full + j]
+        env[s + TOP] = full
+        env[s + SPARE_USED] = 1
+        env[s + RUNNING] = 0
+        env[s + RESHUFFLES] += 1
+
+    tc = env[s + RUNNING] / max(env[s + TOP] / 52, 0.5)
+    bet = 1
+    if params[3] > 0 and tc >= 1:
+        bet = min(int(tc), int(params[1]))
+
+    p1 = _draw(e, shoes, spares, env, full)
+    p2 = _draw(e, shoes, spares, env, full)
+    d1 = _draw(e, shoes, spares, env, full)
+    d2 = _draw(e, shoes, spares, env, full)
+    rc = env[s + RUNNING] + _hilo(p1) + _hilo(p2) + _hilo(d1)
+
+    p_val = _score(p1 + p2, 2)
+    d_val = _score(d1 + d2, 2)
+    net = 0.0
+    settled = False
+    if p_val == 21:
+        rc += _hilo(d2)
+        if d_val != 21:
+            net = bet * params[2]
+        settled = True
+    elif d1 >= 10:
+        # Counted again when the dealer plays, as Simulation does
+        rc += _hilo(d2)
+        if d_val == 21:
+            net = -bet
+            settled = True
+
+    env[s + RUNNING] = rc
+    if settled:
+        envf[e * ENVF_SIZE + NET] += net
+        env[s + ROUNDS] += 1
+        return False
+
+    envf[e * ENVF_SIZE + TC] = tc
+    env[s + UP] = d1
+    env[s + HOLE] = d2
+    env[s + N_HANDS] = 1
+    env[s + CUR] = 0
+    _new_hand(hands, e * MAX_HANDS * HAND_SIZE, p1, p2, bet, 0)
+    return True
+
+
+# --- 2. Kernels ---
+@_jit
+def step_tables(actions, shoes, spares, env, envf, hands, obs, reward, done, params):
+    """
+    Applies one action on every table. A table whose round ends gets the
+    round's net as reward, done = 1, and is left PENDING for deal_tables.
+    """
+    n = len(reward)
+    full = len(shoes) // n
+    for e in range(n):
+        s = e * ENV_SIZE
+        h = (e * MAX_HANDS + env[s + CUR]) * HAND_SIZE
+        a = actions[e]
+        two = hands[h + NCARDS] == 2
+        pair = two and hands[h + C1] == hands[h + C2]
+
+        if a == SPLIT and pair and env[s + N_HANDS] < MAX_HANDS:
+            c = hands[h + C1]
+            flags = 2 if c == 11 else 0
+            v1 = _draw(e, shoes, spares, env, full)
+            v2 = _draw(e, shoes, spares, env, full)
+            env[s + RUNNING] += _hilo(v1) + _hilo(v2)
+            _new_hand(hands, h, c, v1, hands[h + HBET], flags)
+            nh = (e * MAX_HANDS + env[s + N_HANDS]) * HAND_SIZE
+            _new_hand(hands, nh, c, v2, hands[h + HBET], flags)
+            env[s + N_HANDS] += 1
+        elif hands[h + FLAGS] & 2:
+            hands[h + FLAGS] |= 1
+        elif a == HIT or a == DOUBLE:
+            v = _draw(e, shoes, spares, env, full)
+            env[s + RUNNING] += _hilo(v)
+            hands[h + RAW] += v
+            if v == 11:
+                hands[h + ACES] += 1
+            hands[h + NCARDS] += 1
+            if a == DOUBLE:
+                hands[h + HBET] *= 2
+                hands[h + FLAGS] |= 1
+        else:
+            # Stand, or a split of something that is not a pair
+            hands[h + FLAGS] |= 1
+
+        if _next_decision(e, env, hands):
+            reward[e] = 0.0
+            done[e] = 0
+            _observe(e, env, envf, hands, obs)
+        else:
+            reward[e] = _finish_round(e, shoes, spares, env, envf, hands, full)
+            done[e] = 1
+            env[s + PENDING] = 1
+
+
+@_jit
+def deal_tables(shoes, spares, env, envf, hands, obs, params, waiting):
+    """
+    Deals every PENDING table until it faces a decision. A table that has
+    used its spare shoe waits for the caller to shuffle a new one: their
+    indices go in `waiting` and the count is returned.
+    """
+    n = len(env) // ENV_SIZE
+    full = len(shoes) // n
+    count = 0
+    for e in range(n):
+        s = e * ENV_SIZE
+        while env[s + PENDING]:
+            if env[s + SPARE_USED]:
+                waiting[count] = e
+                count += 1
+                break
+            if _deal(e, shoes, spares, env, envf, hands, params, full):
+                env[s + PENDING] = 0
+                _observe(e, env, envf, hands, obs)
+    return count
+
+
+# --- 3. The Environment ---
+class VecEnv:
+    """
+    N independent tables stepped together, each one round of demi_god's
+    Simulation at a time: same deal, peek, split and dealer rules, the same
+    Hi-Lo count. Table i with seed s deals the shoes Simulation(seed=s + i)
+    would. Bets are one unit, or the Simulation's ramp with ramp=True.
+
+    step(actions) takes one action per table (0 hit, 1 stand, 2 double,
+    3 split) for its current hand and returns (obs, reward, done), the
+    same preallocated arrays every call. obs has OBS_SIZE columns per table.
+    A finished round reports its net and done = 1 and the table is dealt
+    a new round at once. Rounds settled on the deal need no action, so
+    they show up only in `net` and `rounds`.
+    """
+
+    def __init__(
+        self,
+        num_envs=256,
+        seed=None,
+        num_decks=NUM_DECKS,
+        shuffle_at=SHUFFLE_AT_DECKS_LEFT,
+        ramp=False,
+        max_units=MAX_BET_UNITS,
+    ):
+        self.num_envs = num_envs
+        self.num_decks = num_decks
+        self.rngs = [
+            random.Random(None if seed is None else seed + i) for i in range(num_envs)
+        ]
+        full = 52 * num_decks
+        shoes = []
+        spares = []
+        for rng in self.rngs:
+            # The first shoe and the next, as Simulation shuffles them
+            shoes += build_values(rng, num_decks)
+            spares += build_values(rng, num_decks)
+        self.shoes = self._array(shoes, "q", "int64")
+        self.spares = self._array(spares, "q", "int64")
+        env = [0] * (num_envs * ENV_SIZE)
+        for e in range(num_envs):
+            env[e * ENV_SIZE + TOP] = full
+            env[e * ENV_SIZE + PENDING] = 1
+        self.env = self._array(env, "q", "int64")
+        self.envf = self._array([0.0] * (num_envs * ENVF_SIZE), "d", "float64")
+        self.hands = self._array([0] * (num_envs * MAX_HANDS * HAND_SIZE), "q", "int64")
+        self.params = self._array(
+            [shuffle_at, max_units, BLACKJACK_PAYOUT, 1.0 if ramp else 0.0],
+            "d",
+            "float64",
+        )
+        self.obs_flat = self._array([0.0] * (num_envs * OBS_SIZE), "f", "float32")
+        self.reward = self._array([0.0] * num_envs, "f", "float32")
+        self.done = self._array([0] * num_envs, "B", "uint8")
+        # With numpy, obs is an (N, OBS_SIZE) view of the same buffer
+        self.obs = self.obs_flat.reshape(num_envs, OBS_SIZE) if np else self.obs_flat
+        # A buffer callers may fill and pass to step, to avoid allocating
+        self.actions = self._array([0] * num_envs, "q", "int64")
+        self.waiting = self._array([0] * num_envs, "q", "int64")
+        self._deal_pending()
+
+    @staticmethod
+    def _array(values, typecode, dtype):
+        if np is not None:
+            return np.array(values, dtype=dtype)
+        return array.array(typecode, values)
+
+    def _deal_pending(self):
+        full = 52 * self.num_decks
+        while True:
+            count = deal_tables(
+                self.shoes,
+                self.spares,
+                self.env,
+                self.envf,
+                self.hands,
+                self.obs_flat,
+                self.params,
+                self.waiting,
+            )
+            if not count:
+                return
+            # Shuffle the next shoe for each table that used its spare
+            for k in range(count):
+                e = int(self.waiting[k])
+                self.spares[e * full : (e + 1) * full] = self._array(
+                    build_values(self.rngs[e], self.num_decks), "q", "int64"
+                )
+                self.env[e * ENV_SIZE + SPARE_USED] = 0
+
+    def reset(self):
+        return self.obs
+
+    def step(self, actions):
+        if np is not None:
+            actions = np.asarray(actions, dtype=np.int64)
+        step_tables(
+            actions,
+            self.shoes,
+            self.spares,
+            self.env,
+            self.envf,
+            self.hands,
+            self.obs_flat,
+            self.reward,
+            self.done,
+            self.params,
+        )
+        self._deal_pending()
+        return self.obs, self.reward, self.done
+
+    # --- Totals ---
+    def net(self, e):
+        """Units won on table e over every round, settled-on-the-deal ones too."""
+        return self.envf[e * ENVF_SIZE + NET]
+
+    def rounds(self, e):
+        return self.env[e * ENV_SIZE + ROUNDS]
+
+    def reshuffles(self, e):
+        return self.env[e * ENV_SIZE + RESHUFFLES]
+
+
+# --- 4. Verification ---
+def basic_policy():
+    """Actions from observations: demi_god's StrategyEngine as a lookup table."""
+    from fast_kernel import build_action_table, table_index
+
+    table = build_action_table()
+
+    def policy(obs, actions):
+        for e in range(len(actions)):
+            o = e * OBS_SIZE
+            actions[e] = table[
+                table_index(
+                    int(obs[o + OBS_PAIR]),
+                    int(obs[o + OBS_SOFT]),
+                    int(obs[o + OBS_TOTAL]),
+                    int(obs[o + OBS_TWO]),
+                    int(obs[o + OBS_UP]),
+                )
+            ]
+
+    return policy
+
+
+def verify(num_envs=8, seed=0, steps=20000):
+    """Basic strategy on every table wins what Simulation wins on the same seed."""
+    from demi_god_logic import MIN_BET, Simulation
+
+    env = VecEnv(num_envs, seed=seed, ramp=True)
+    policy = basic_policy()
+    for _ in range(steps):
+        policy(env.obs_flat, env.actions)
+        env.step(env.actions)
+    failed = []
+    for e in range(num_envs):
+        sim = Simulation(seed=seed + e, bankroll=10**9)
+        for _ in range(env.rounds(e)):
+            sim.play_round()
+        want = sim.balance - 10**9
+        got = env.net(e) * MIN_BET
+        status = "identical" if got == want else f"MISMATCH, Simulation won {want}"
+        print(f"Table {e}: {env.rounds(e)} rounds, won {got:.0f} {status}")
+        if got != want:
+            failed.append(e)
+    if failed:
+        raise AssertionError(f"tables {failed} differ from Simulation")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Vectorised blackjack tables")
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--envs", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.verify:
+        verify()
+    else:
+        env = VecEnv(args.envs, seed=1)
+        policy = basic_policy()
+        acting = 0.0
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            t = time.perf_counter()
+            policy(env.obs_flat, env.actions)
+            acting += time.perf_counter() - t
+            env.step(env.actions)
+        elapsed = time.perf_counter() - start - acting
+        steps = args.envs * args.steps
+        backend = "numba" if njit is not None else "pure Python"
+        print(f"{steps / elapsed:,.0f} table steps/s ({backend}, policy time excluded)")
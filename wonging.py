@@ -0,0 +1,166 @@
+import time
+
+from demi_god_logic import Simulation
+
+
+# --- Configuration ---
+ENTER_TC = 2  # Sit down once the true count reaches this
+EXIT_TC = 0  # Leave when it falls below this (and at every shuffle)
+
+
+class WongSimulation(Simulation):
+    """
+    demi_god Simulation for a back-counter, who watches the table and
+    only plays while the true count is at least `enter`, leaving when it
+    drops below `exit` or the shoe is shuffled.
+
+    A round the player sits out is only dealt: one stand-in hand and the
+    dealer both draw to 17, and the cards go into the running count. No
+    strategy, no bet, no settlement and nothing recorded, so time spent
+    watching costs a fraction of a played round.
+
+    play_round() is one round at the table, played or watched. With
+    enter=-inf and exit=-inf every round is played and this is exactly
+    Simulation.
+    """
+
+    def __init__(self, enter=ENTER_TC, exit=EXIT_TC, **kwargs):
+        super().__init__(**kwargs)
+        if exit > enter:
+            raise ValueError("the exit count must not be above the entry count")
+        self.enter = enter
+        self.exit = exit
+        self.seated = False
+        self.rounds = 0  # At the table
+        self.played = 0
+        # Simulation(rules=) sets its own round loop on the instance
+        seated_round = self.__dict__.pop("play_round", None)
+        self.seated_round = seated_round or super().play_round
+
+    def play_round(self):
+        shoe = self.shoe
+        counter = self.counter
+        if shoe.decks_remaining() <= self.shuffle_at:
+            shoe.build()
+            counter.reset()
+            self.reshuffles += 1
+            self.seated = False
+        counter.update_true_count(shoe.decks_remaining())
+
+        tc = counter.true_count
+        self.seated = tc >= self.exit if self.seated else tc >= self.enter
+        self.rounds += 1
+        if not self.seated:
+            self.watch_round()
+            return False
+        self.seated_round()
+        self.played += 1
+        return True
+
+    def watch_round(self):
+        """Deals a round nobody here plays: a stand-in hand and the dealer, both to 17."""
+        deal = self.shoe.deal
+        running = 0
+        for _ in range(2):
+            total = aces = 0
+            drawn = 0
+            while total < 17 or drawn < 2:
+                card = deal()
+                running += card.count_value
+                total += card.value
+                drawn += 1
+                if card.value == 11:
+                    aces += 1
+                if total > 21 and aces:
+                    total -= 10
+                    aces -= 1
+        self.counter.running_count += running
+
+    def run(self, rounds=100000, stats=None, telemetry=None):
+        """
+        Watches the table for `rounds` rounds, playing those the count
+        allows. Only played rounds reach `stats`; telemetry follows
+        table rounds, watched ones included.
+        """
+        counter = self.counter
+        mask = -1
+        if telemetry is not None:
+            telemetry.start(self, rounds)
+            mask = telemetry.mask
+        done = 0
+        for done in range(1, rounds + 1):
+            if self.balance <= 0:
+                done -= 1
+                break
+            if not done & mask:
+                telemetry.sample(self, done - 1)
+            before = self.balance
+            if self.play_round() and stats is not None:
+                stats.record(
+                    self.balance - before,
+                    counter.get_bet(),
+                    counter.true_count,
+                    self.balance,
+                )
+        if telemetry is not None:
+            telemetry.finish(self, done)
+        print(f"Final balance: ${self.balance}")
+        return stats
+
+
+def verify(seeds=range(3), rounds=20000):
+    """Never leaving the table plays exactly what Simulation plays."""
+    failed = []
+    for seed in seeds:
+        ref = Simulation(seed=seed, bankroll=10**9)
+        sim = WongSimulation(float("-inf"), float("-inf"), seed=seed, bankroll=10**9)
+        for _ in range(rounds):
+            ref.play_round()
+            sim.play_round()
+        got = (sim.balance, sim.counter.running_count, sim.reshuffles)
+        want = (ref.balance, ref.counter.running_count, ref.reshuffles)
+        print(f"Seed {seed}: {'identical' if got == want else f'MISMATCH {got} != {want}'}")
+        if got != want:
+            failed.append(seed)
+    if failed:
+        raise AssertionError(f"WongSimulation differs from Simulation on seeds {failed}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import io
+    from contextlib import redirect_stdout
+
+    from demi_god_logic import NUM_DECKS, SHUFFLE_AT_DECKS_LEFT
+
+    parser = argparse.ArgumentParser(description="Back-counting (wonging) simulation")
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--rounds", type=int, default=200000, help="table rounds")
+    parser.add_argument("--enter", type=float, default=ENTER_TC)
+    parser.add_argument("--exit", type=float, default=EXIT_TC)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--decks", type=int, default=NUM_DECKS)
+    parser.add_argument("--shuffle-at", type=float, default=SHUFFLE_AT_DECKS_LEFT)
+    args = parser.parse_args()
+
+    if args.verify:
+        verify()
+    else:
+        sim = WongSimulation(
+            args.enter,
+            args.exit,
+            seed=args.seed,
+            bankroll=10**9,
+            num_decks=args.decks,
+            shuffle_at=args.shuffle_at,
+        )
+        start = time.time()
+        with redirect_stdout(io.StringIO()):
+            sim.run(args.rounds)
+        elapsed = time.time() - start
+        won = sim.balance - 10**9
+        share = sim.played / sim.rounds
+        print(f"Played {sim.played:,} of {sim.rounds:,} rounds ({100 * share:.1f}%)")
+        print(f"EV per played round: ${won / max(sim.played, 1):.3f}")
+        print(f"EV per 100 table rounds: ${100 * won / sim.rounds:.2f}")
+        print(f"{sim.rounds / elapsed:,.0f} table rounds/s")